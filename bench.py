@@ -0,0 +1,703 @@
+"""
+Whisper Dictation - Benchmarks for the audio and transcription pipeline
+"""
+import argparse
+import ctypes
+import glob
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import wave
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import dictation
+
+# ============= Helpers =============
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+def current_rss_mb():
+    """Current resident set size of this process in MB."""
+    import psutil
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+def run_isolated(func, *args):
+    """Run func in a fresh process so its peak RSS is not polluted by other cases."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(func, *args).result()
+
+def synthetic_chunks(seconds, rate, chunk):
+    """Yield int16 PCM chunks like stream.read() would, one fresh bytes object each."""
+    rng = np.random.default_rng(0)
+    for _ in range(int(seconds * rate / chunk)):
+        yield rng.integers(-3000, 3000, chunk, dtype=np.int16).tobytes()
+
+# ============= Capture Benchmark =============
+
+def capture_case(method, seconds, rate, chunk):
+    """Capture `seconds` of synthetic audio with the given method and report its cost."""
+    baseline = current_rss_mb()
+    start = time.perf_counter()
+
+    if method == "list":
+        # Previous implementation: list of bytes, join, int16 view, float32, normalise
+        frames = []
+        for data in synthetic_chunks(seconds, rate, chunk):
+            frames.append(data)
+        audio_data = np.frombuffer(b''.join(frames), dtype=np.int16).astype(np.float32) / 32768.0
+        samples = len(audio_data)
+        copies = 3.0  # join, astype, divide
+    else:
+        buffer = dictation.CaptureBuffer(rate, max_seconds=max(seconds, 600))
+        for data in synthetic_chunks(seconds, rate, chunk):
+            buffer.append(data)
+        audio_data = buffer.view()
+        samples = len(audio_data)
+        # One conversion pass plus whatever was moved while growing
+        copies = 1.0 + buffer.grow_bytes / (samples * 4)
+
+    return {
+        "method": method,
+        "seconds": seconds,
+        "samples": samples,
+        "full_copies": round(copies, 2),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+def bench_capture(args):
+    """Compare the list-of-bytes capture path against CaptureBuffer."""
+    results = []
+    for seconds in args.seconds:
+        for method in ("list", "buffer"):
+            results.append(run_isolated(capture_case, method, seconds, args.rate, args.chunk))
+    return results
+
+# ============= Sample Conversion Benchmark =============
+
+def encode_samples(signal, sample_format):
+    """Float samples in [-1, 1] as PCM bytes in sample_format."""
+    if sample_format == "paFloat32":
+        return signal.astype(np.float32).tobytes()
+    if sample_format == "paInt32":
+        return (signal * (2**31 - 1)).astype(np.int32).tobytes()
+    if sample_format == "paInt24":
+        values = (signal * (2**23 - 1)).astype(np.int32)
+        return values.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return (signal * 32767).astype(np.int16).tobytes()
+
+def bench_convert(args):
+    """Throughput of converting each capture format to float32, chunk by chunk."""
+    rng = np.random.default_rng(0)
+    samples = args.seconds * args.rate
+    signal = np.clip(rng.normal(0, 0.2, samples), -1, 1)
+    results = []
+    for sample_format in dictation.SAMPLE_WIDTHS:
+        data = encode_samples(signal, sample_format)
+        width = dictation.sample_width(sample_format)
+        chunk_bytes = args.chunk * width
+        chunks = [data[i:i + chunk_bytes] for i in range(0, len(data), chunk_bytes)]
+        times = []
+        for _ in range(args.runs):
+            buffer = dictation.CaptureBuffer(args.rate, max_seconds=args.seconds, sample_format=sample_format)
+            start = time.perf_counter()
+            for chunk in chunks:
+                buffer.append(chunk)
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        error = float(np.abs(buffer.view() - signal.astype(np.float32)).max())
+        results.append({
+            "format": sample_format,
+            "msamples_per_s": round(samples / best / 1e6, 1),
+            "x_realtime": round(args.seconds / best),
+            "us_per_chunk": round(best / len(chunks) * 1e6, 2),
+            "max_error": error,
+        })
+    return results
+
+def bench_resample(args):
+    """Cost of resampling capture chunks to 16 kHz as they arrive."""
+    results = []
+    for rate in args.rates:
+        signal = np.random.default_rng(0).normal(0, 0.2, args.seconds * rate).astype(np.float32)
+        chunks = [signal[i:i + args.chunk] for i in range(0, len(signal), args.chunk)]
+        times = []
+        for _ in range(args.runs):
+            resampler = dictation.Resampler(rate, dictation.WHISPER_RATE)
+            start = time.perf_counter()
+            for chunk in chunks:
+                resampler.process(chunk)
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        results.append({
+            "rate": rate,
+            "taps": resampler.taps,
+            "phases": resampler.up,
+            "x_realtime": round(args.seconds / best),
+            "us_per_chunk": round(best / len(chunks) * 1e6, 1),
+            "cpu_percent": round(best / args.seconds * 100, 3),
+        })
+    return results
+
+# ============= Pre-roll Benchmark =============
+
+def idle_cpu_percent(seconds):
+    """CPU used by this process while it sleeps for `seconds`, as a percentage of one core."""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    return round((time.process_time() - cpu_start) / (time.perf_counter() - wall_start) * 100, 3)
+
+def bench_preroll(args):
+    """Idle CPU cost of the always-open pre-roll stream, and the stream open time it saves."""
+    import pyaudio
+
+    d = dictation
+    d.config = d.merge_config({}, d.DEFAULT_CONFIG)
+    d.config["audio"]["preroll_ms"] = args.preroll_ms
+    d.audio = pyaudio.PyAudio()
+    try:
+        open_times = []
+        for _ in range(args.runs):
+            source = d.PyAudioSource(d.capture_rate(), 1, d.config["audio"]["chunk"])
+            start = time.perf_counter()
+            source.open()
+            open_times.append((time.perf_counter() - start) * 1000)
+            source.close()
+
+        baseline = idle_cpu_percent(args.seconds)
+        d.start_preroll()
+        with_preroll = idle_cpu_percent(args.seconds)
+        d.standing_source.shutdown()
+        return {
+            "preroll_ms": args.preroll_ms,
+            "rate": d.capture_rate(),
+            "idle_cpu_percent": baseline,
+            "idle_cpu_percent_with_preroll": with_preroll,
+            "stream_open_ms_p50": percentile(open_times, 50),
+            "stream_open_ms_max": round(max(open_times), 2),
+        }
+    finally:
+        d.audio.terminate()
+
+# ============= Stream Open Benchmark =============
+
+def bench_stream(args):
+    """Per input device: time to open a new stream versus resuming a paused one."""
+    import pyaudio
+
+    pa = pyaudio.PyAudio()
+    try:
+        devices = [pa.get_device_info_by_index(i) for i in range(pa.get_device_count())]
+        devices = [dev for dev in devices if dev["maxInputChannels"] > 0
+                   and (not args.devices or dev["index"] in args.devices)]
+        results = []
+        for dev in devices:
+            rate = int(dev["defaultSampleRate"])
+
+            def open_stream():
+                return pa.open(format=pyaudio.paInt16, channels=1, rate=rate, input=True,
+                               input_device_index=dev["index"], frames_per_buffer=args.chunk,
+                               stream_callback=lambda *_: (None, pyaudio.paContinue))
+
+            open_times, resume_times = [], []
+            try:
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    stream = open_stream()
+                    open_times.append((time.perf_counter() - start) * 1000)
+                    stream.stop_stream()
+                    start = time.perf_counter()
+                    stream.start_stream()
+                    resume_times.append((time.perf_counter() - start) * 1000)
+                    stream.stop_stream()
+                    stream.close()
+            except (IOError, OSError) as e:
+                results.append({"device": dev["name"], "error": str(e)})
+                continue
+            results.append({
+                "device": dev["name"],
+                "host_api": pa.get_host_api_info_by_index(dev["hostApi"])["name"],
+                "rate": rate,
+                "open_ms_p50": percentile(open_times, 50),
+                "open_ms_max": round(max(open_times), 2),
+                "resume_ms_p50": percentile(resume_times, 50),
+                "resume_ms_max": round(max(resume_times), 2),
+            })
+        return results
+    finally:
+        pa.terminate()
+
+# ============= Startup Benchmark =============
+
+# Runs the same startup phases as main() in a fresh interpreter and prints
+# the per-phase timings as JSON on the last line.
+STARTUP_SCRIPT = """
+import json, os, sys
+import dictation as d
+with d.timed("config"):
+    d.load_config()
+with d.timed("audio"):
+    import pyaudio
+    d.audio = pyaudio.PyAudio()
+if "--ui" in sys.argv:
+    with d.timed("ui"):
+        d.indicator = d.RecordingIndicator()
+        d.indicator.root.update()
+with d.timed("model"):
+    d.model = d.load_whisper_model()
+print(json.dumps({"imports": d.IMPORT_END - d.IMPORT_START, **d.startup_times}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+def bench_startup(args):
+    """Break cold-start time down by phase over several fresh processes."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, "-c", STARTUP_SCRIPT] + (["--ui"] if args.ui else [])
+    runs = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = subprocess.run(command, cwd=here, capture_output=True, text=True, check=True).stdout
+        phases = json.loads(output.strip().splitlines()[-1])
+        phases["process_total"] = time.perf_counter() - start
+        runs.append(phases)
+    return {
+        phase: {
+            "median_s": round(statistics.median(run[phase] for run in runs), 3),
+            "max_s": round(max(run[phase] for run in runs), 3),
+        }
+        for phase in runs[0]
+    }
+
+# ============= Import-Time Benchmark =============
+
+# Modules that must not be imported when dictation.py is imported
+HEAVY_MODULES = ("torch", "whisper", "faster_whisper", "keyboard", "tkinter", "pystray", "PIL")
+
+def bench_imports(args):
+    """Profile `import dictation` with -X importtime and flag eager heavy imports."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import dictation"],
+        cwd=here, capture_output=True, text=True, check=True
+    )
+
+    # Lines look like: "import time:      self [us] |  cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append({
+            "module": name.strip(),
+            "depth": depth,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+
+    dictation_entry = next((m for m in modules if m["module"] == "dictation"), None)
+    heavy = sorted({m["module"].split(".")[0] for m in modules} & set(HEAVY_MODULES))
+
+    report = {
+        "total_ms": dictation_entry["cumulative_ms"] if dictation_entry else None,
+        "heavy_eager": heavy,
+        "slowest": sorted(modules, key=lambda m: m["self_ms"], reverse=True)[:args.top],
+    }
+    if args.check and heavy:
+        print(json.dumps(report, indent=2))
+        sys.exit(f"Heavy modules imported eagerly: {', '.join(heavy)}")
+    return report
+
+# ============= Transcription Benchmark =============
+
+def load_fixture(path):
+    """Read a 16 kHz mono WAV fixture as float32 samples."""
+    with wave.open(path, "rb") as wf:
+        if wf.getframerate() != dictation.WHISPER_RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: fixtures must be 16 kHz mono 16-bit PCM")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+
+def load_corpus(directory):
+    """Load every WAV in directory with its reference transcript (same name, .txt)."""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding="utf-8") as f:
+                reference = f.read().strip()
+        corpus.append((os.path.basename(path), load_fixture(path), reference))
+    return corpus
+
+def normalize_words(text):
+    """Lower-case words with punctuation removed, for word error rate."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance between two transcripts. Returns (errors, reference words)."""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 4) if values else None
+
+def transcribe_case(fixtures, language, model_name, engine, threads):
+    """Load one model/backend/thread-count combination and decode the whole corpus."""
+    dictation.config = dictation.merge_config({}, dictation.DEFAULT_CONFIG)
+    dictation.config["language"] = language
+    dictation.config["backend"]["engine"] = engine
+    dictation.config["backend"]["cpu_threads"] = threads
+    dictation.config["tracing"]["enabled"] = False
+    rate = dictation.WHISPER_RATE  # Fixtures are 16 kHz (load_fixture checks)
+    case = {"model": model_name, "backend": engine, "threads": threads}
+
+    corpus = load_corpus(fixtures)
+    start = time.perf_counter()
+    try:
+        backend = dictation.BACKENDS[engine](model_name)
+    except ImportError as e:
+        return {**case, "error": f"{engine} not available: {e}"}
+    case["load_s"] = round(time.perf_counter() - start, 3)
+    dictation.warm_up_model(backend)
+
+    clips, latencies = [], []
+    total_audio = total_time = total_errors = total_words = 0
+    for name, samples, reference in corpus:
+        # Same decode path as transcribe_audio: VAD trim, then the backend
+        start = time.perf_counter()
+        trimmed = dictation.trim_silence(samples, rate)
+        text = "" if trimmed is None else dictation.run_model(trimmed, backend=backend)["text"].strip()
+        elapsed = time.perf_counter() - start
+
+        duration = len(samples) / rate
+        clip = {"clip": name, "seconds": round(duration, 2), "latency_s": round(elapsed, 4),
+                "rtf": round(elapsed / duration, 4), "text": text}
+        if reference is not None:
+            errors, words = word_errors(reference, text)
+            clip["wer"] = round(errors / max(words, 1), 4)
+            total_errors += errors
+            total_words += words
+        clips.append(clip)
+        latencies.append(elapsed)
+        total_audio += duration
+        total_time += elapsed
+
+    return {
+        **case,
+        "clips": len(clips),
+        "audio_s": round(total_audio, 2),
+        "rtf": round(total_time / total_audio, 4) if total_audio else None,
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "latency_max_s": round(max(latencies), 4) if latencies else None,
+        "wer": round(total_errors / total_words, 4) if total_words else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "per_clip": clips,
+    }
+
+def bench_transcribe(args):
+    """Decode a fixed corpus across models, backends and thread counts."""
+    if not glob.glob(os.path.join(args.fixtures, "*.wav")):
+        sys.exit(f"No WAV fixtures found in {args.fixtures}")
+    results = []
+    for model_name in args.models:
+        for engine in args.backends:
+            for threads in args.threads:
+                print(f"→ {model_name} / {engine} / {threads or 'default'} threads", file=sys.stderr)
+                results.append(run_isolated(transcribe_case, args.fixtures, args.language,
+                                            model_name, engine, threads))
+    return results
+
+# ============= Pipeline Benchmark =============
+
+def bench_pipeline(args):
+    """Run capture -> VAD -> transcribe -> output end to end from a file or synthetic source."""
+    d = dictation
+    d.config = d.merge_config({}, d.DEFAULT_CONFIG)
+    d.config["language"] = args.language
+    d.config["backend"]["engine"] = args.backend
+    d.config["streaming"]["enabled"] = args.streaming or args.live != "off"
+    d.config["streaming"]["live_output"] = args.live
+    if args.live != "off":
+        # Live typing is refused for modifier hotkeys; nothing is held in a headless run
+        d.config["hotkey"]["ctrl"] = d.config["hotkey"]["shift"] = False
+    d.config["output"]["method"] = "none"
+    d.config["tracing"]["enabled"] = False
+
+    # The hotkey path builds its source from config, so replay the synthetic clip from a file
+    path = args.source
+    if args.source == "synthetic":
+        synthetic = d.SyntheticAudioSource(seconds=args.seconds)
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.wav")
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(synthetic.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(synthetic.rate)
+            wf.writeframes(synthetic.pcm)
+    d.config["audio"].update(source="file", source_file=path, realtime=args.realtime)
+    with wave.open(path, "rb") as wf:
+        duration = wf.getnframes() / wf.getframerate()
+
+    d.model_cache = d.ModelCache(prefetch=False)
+    d.config["model"] = args.model
+    d.activate_model()
+    d.start_transcription_worker()
+    d.start_hotkey_dispatcher()
+
+    # Hold the hotkey for the clip's length when paced, else just long enough to start
+    hold = duration if args.realtime else 0.05
+    runs = []
+    for _ in range(args.runs):
+        d.audio_thread = None
+        hotkey = d.ScriptedHotkeyBackend([(0.0, "down"), (hold, "up")])
+        hotkey.install()
+        hotkey.run()
+        while d.audio_thread is None or d.recording:
+            time.sleep(0.01)
+        d.audio_thread.join()
+        d.transcription_worker.drain()
+        trace = d.current_trace
+        runs.append({"events": trace.events, **trace.info})
+
+    # The recording ends at the release, or earlier if the clip runs out first
+    release_to_text = []
+    for r in runs:
+        events = r["events"]
+        ended = min(events.get("source_end", events["hotkey_up"]), events["hotkey_up"])
+        if "inference_end" in events:
+            release_to_text.append(events["inference_end"] - ended)
+    return {
+        "source": args.source,
+        "realtime": args.realtime,
+        "model": args.model,
+        "backend": args.backend,
+        "streaming": d.config["streaming"]["enabled"],
+        "live_output": args.live,
+        "release_to_text_ms_p50": percentile(release_to_text, 50),
+        "release_to_text_ms_p95": percentile(release_to_text, 95),
+        "runs": runs,
+    }
+
+# ============= Hotkey Callback Benchmark =============
+
+def legacy_key_event(vk, wParam, hotkey_cfg, get_async_key_state):
+    """The previous per-event hotkey logic, with the GetAsyncKeyState calls injected."""
+    ctrl_pressed = get_async_key_state(dictation.VK_CONTROL) & 0x8000 != 0
+    shift_pressed = get_async_key_state(dictation.VK_SHIFT) & 0x8000 != 0
+    target_key_code = ord(hotkey_cfg["key"].upper())
+    is_our_hotkey = (
+        ((not hotkey_cfg["ctrl"]) or ctrl_pressed) and
+        ((not hotkey_cfg["shift"]) or shift_pressed) and
+        vk == target_key_code
+    )
+    if is_our_hotkey and wParam == dictation.WM_KEYDOWN:
+        threading.Thread(target=lambda: None, daemon=True)  # constructed per press, not started
+        return True
+    return False
+
+def hook_events(kind, count):
+    """A stream of (vk, wParam) events: ordinary typing, or repeated hotkey presses."""
+    down, up = dictation.WM_KEYDOWN, dictation.WM_KEYUP
+    if kind == "typing":
+        keys = [vk for vk in range(0x41, 0x5B) if vk != ord("D")]
+        cycle = [(vk, w) for vk in keys for w in (down, up)]
+    else:
+        cycle = [(dictation.VK_LCONTROL, down), (dictation.VK_LSHIFT, down), (ord("D"), down),
+                 (ord("D"), down), (ord("D"), up), (dictation.VK_LSHIFT, up), (dictation.VK_LCONTROL, up)]
+    return (cycle * (count // len(cycle) + 1))[:count]
+
+def time_events(handler, events):
+    """Per-event cost (ns) and transient memory (bytes above baseline) of handler over events."""
+    start = time.perf_counter_ns()
+    for vk, wparam in events:
+        handler(vk, wparam)
+    elapsed = time.perf_counter_ns() - start
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for vk, wparam in events:
+        handler(vk, wparam)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ns_per_event": round(elapsed / len(events), 1), "peak_bytes": peak - baseline}
+
+def bench_hook(args):
+    """Micro-benchmark the keyboard hook's per-event cost."""
+    dictation.config = dictation.merge_config({}, dictation.DEFAULT_CONFIG)
+    dictation.compile_hotkey()
+    hotkey_cfg = dictation.config["hotkey"]
+    fake_key_state = lambda vk: 0x8000
+
+    results = []
+    for kind in ("typing", "hotkey"):
+        events = hook_events(kind, args.events)
+        results.append({"events": kind, "handler": "legacy",
+                        **time_events(lambda vk, w: legacy_key_event(vk, w, hotkey_cfg, fake_key_state), events)})
+        results.append({"events": kind, "handler": "process_key_event",
+                        **time_events(dictation.process_key_event, events)})
+
+        if dictation.user32:
+            # Full ctypes callback path, including CallNextHookEx, on Windows
+            kb = dictation.KBDLLHOOKSTRUCT()
+            address = ctypes.addressof(kb)
+
+            def full_callback(vk, wparam):
+                kb.vkCode = vk
+                dictation.keyboard_callback(0, wparam, address)
+            results.append({"events": kind, "handler": "keyboard_callback", **time_events(full_callback, events)})
+    return results
+
+# ============= Text Injection Benchmark =============
+
+SAMPLE_WORDS = "the quick brown fox jumps over the lazy dog while we dictate a longer paragraph".split()
+
+def sample_text(size):
+    """Dictation-like text of exactly size characters."""
+    text = " ".join(SAMPLE_WORDS * (size // len(SAMPLE_WORDS) + 1))
+    return text[:size].rstrip() + "." if size > 1 else text[:size]
+
+def bench_output(args):
+    """Time typing versus pasting text of several sizes into the focused window."""
+    import keyboard
+
+    dictation.config = dictation.merge_config({}, dictation.DEFAULT_CONFIG)
+    restore_wait = dictation.config["output"]["restore_delay_ms"] / 1000 + 0.1
+    print(f"Typing into the focused window in {args.delay}s...", file=sys.stderr)
+    time.sleep(args.delay)
+
+    inject = {"type": dictation.type_text, "paste": dictation.paste_text}
+    results = []
+    for size in args.sizes:
+        text = sample_text(size)
+        for method in ("type", "paste"):
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                inject[method](text)
+                times.append((time.perf_counter() - start) * 1000)
+                # Let the paste land and the clipboard restore before the next run
+                time.sleep(restore_wait)
+                keyboard.send("enter")
+            results.append({"chars": size, "method": method,
+                            "ms_median": round(statistics.median(times), 2),
+                            "ms_max": round(max(times), 2)})
+    return results
+
+# ============= Main Function =============
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper Dictation benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # Options shared by every benchmark
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", help="also write the JSON report to this file")
+
+    capture = sub.add_parser("capture", parents=[common], help="capture buffer copies and peak RSS")
+    capture.add_argument("--seconds", type=float, nargs="+", default=[30, 600])
+    capture.add_argument("--rate", type=int, default=16000)
+    capture.add_argument("--chunk", type=int, default=1024)
+    capture.set_defaults(func=bench_capture)
+
+    startup = sub.add_parser("startup", parents=[common], help="cold-start time by phase")
+    startup.add_argument("--runs", type=int, default=3)
+    startup.add_argument("--ui", action="store_true", help="include creating the Tk window")
+    startup.set_defaults(func=bench_startup)
+
+    imports = sub.add_parser("imports", parents=[common], help="import-time profile of dictation.py")
+    imports.add_argument("--top", type=int, default=15, help="number of slowest modules to list")
+    imports.add_argument("--check", action="store_true", help="fail if heavy modules are imported eagerly")
+    imports.set_defaults(func=bench_imports)
+
+    transcribe = sub.add_parser("transcribe", parents=[common], help="real-time factor, latency and WER over WAV fixtures")
+    transcribe.add_argument("--fixtures", default="fixtures", help="directory of 16 kHz mono WAVs with .txt references")
+    transcribe.add_argument("--models", nargs="+", default=dictation.AVAILABLE_MODELS)
+    transcribe.add_argument("--backends", nargs="+", default=list(dictation.BACKENDS))
+    transcribe.add_argument("--threads", type=int, nargs="+", default=[0], help="CPU threads (0 = library default)")
+    transcribe.add_argument("--language", default="en")
+    transcribe.set_defaults(func=bench_transcribe)
+
+    pipeline = sub.add_parser("pipeline", parents=[common], help="end-to-end pipeline from a file or synthetic source")
+    pipeline.add_argument("--source", default="synthetic", help='"synthetic" or a WAV/raw file path')
+    pipeline.add_argument("--seconds", type=float, default=3.0, help="speech length of the synthetic source")
+    pipeline.add_argument("--realtime", action="store_true", help="pace the source like a live microphone")
+    pipeline.add_argument("--model", default="tiny")
+    pipeline.add_argument("--backend", default="openai-whisper")
+    pipeline.add_argument("--streaming", action="store_true")
+    pipeline.add_argument("--live", default="off", choices=["off", "committed", "tentative"],
+                          help="type streamed text while recording (implies --streaming)")
+    pipeline.add_argument("--runs", type=int, default=3)
+    pipeline.add_argument("--language", default="en")
+    pipeline.set_defaults(func=bench_pipeline)
+
+    hook = sub.add_parser("hook", parents=[common], help="per-event cost of the keyboard hook callback")
+    hook.add_argument("--events", type=int, default=200000)
+    hook.set_defaults(func=bench_hook)
+
+    output = sub.add_parser("output", parents=[common], help="time typing versus pasting text into the focused window")
+    output.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    output.add_argument("--runs", type=int, default=3)
+    output.add_argument("--delay", type=float, default=3.0, help="seconds to focus a text field first")
+    output.set_defaults(func=bench_output)
+
+    convert = sub.add_parser("convert", parents=[common], help="capture-format to float32 conversion throughput")
+    convert.add_argument("--seconds", type=int, default=60)
+    convert.add_argument("--rate", type=int, default=48000)
+    convert.add_argument("--chunk", type=int, default=1024)
+    convert.add_argument("--runs", type=int, default=5)
+    convert.set_defaults(func=bench_convert)
+
+    resample = sub.add_parser("resample", parents=[common], help="per-chunk cost of resampling to 16 kHz")
+    resample.add_argument("--rates", type=int, nargs="+", default=[44100, 48000, 96000])
+    resample.add_argument("--seconds", type=int, default=30)
+    resample.add_argument("--chunk", type=int, default=1024)
+    resample.add_argument("--runs", type=int, default=3)
+    resample.set_defaults(func=bench_resample)
+
+    preroll = sub.add_parser("preroll", parents=[common], help="idle CPU of the always-open pre-roll stream")
+    preroll.add_argument("--preroll-ms", type=int, default=500)
+    preroll.add_argument("--seconds", type=float, default=10.0)
+    preroll.add_argument("--runs", type=int, default=5)
+    preroll.set_defaults(func=bench_preroll)
+
+    stream = sub.add_parser("stream", parents=[common], help="open versus resume latency of each input device")
+    stream.add_argument("--devices", type=int, nargs="*", help="device indices (default: every input device)")
+    stream.add_argument("--chunk", type=int, default=1024)
+    stream.add_argument("--runs", type=int, default=5)
+    stream.set_defaults(func=bench_stream)
+
+    args = parser.parse_args()
+    report = json.dumps(args.func(args), indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
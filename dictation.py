@@ -1,25 +1,28 @@
 """
 Whisper Dictation - A speech-to-text application using OpenAI's Whisper model
 """
-import whisper
-import pyaudio
+import time
+IMPORT_START = time.perf_counter()
+
 import wave
-import keyboard
 import pyperclip
-import time
 import threading
 import os
+from collections import deque, OrderedDict, Counter
+import gc
+import importlib
+import math
+import logging
+from logging.handlers import RotatingFileHandler
 import numpy as np
-import tkinter as tk
-from tkinter import ttk, messagebox
 import json
 from pathlib import Path
 import ctypes
 from ctypes import wintypes
 import sys
-import pystray
-from PIL import Image, ImageDraw
 import warnings
+from contextlib import contextmanager
+from functools import partial
 
 # Hide console window when run from file explorer
 if sys.executable.endswith('pythonw.exe') or (hasattr(sys, 'frozen') and sys.frozen):
@@ -56,11 +59,19 @@ else:
         # If anything fails, continue with console visible
         pass
 
+# Heavy modules (whisper/torch, keyboard, tkinter, pystray, PIL) are imported
+# where they are first used, so the window and hotkey come up without them.
+
 # Suppress specific warnings
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
 
+IMPORT_END = time.perf_counter()
+
 # ============= Constants and Globals =============
 
+# Whisper models expect 16 kHz mono audio
+WHISPER_RATE = 16000
+
 # Available Whisper models (fastest to slowest)
 AVAILABLE_MODELS = ["tiny", "base", "small", "medium", "large-v3"]
 
@@ -69,17 +80,74 @@ CONFIG_FILE = "config.json"
 DEFAULT_CONFIG = {
     "model": "tiny",
     "language": "en", 
-    "hotkey": {"ctrl": True, "shift": True, "key": "d"},
+    "backend": {
+        "engine": "openai-whisper",
+        "compute_type": "int8",
+        "cpu_threads": 0,
+        "warmup": True
+    },
+    "hotkey": {"ctrl": True, "shift": True, "key": "d", "backend": "auto"},
     "audio": {
         "chunk": 1024,
         "format": "paInt16",
         "channels": 1,
-        "rate": 16000
+        "rate": "native",
+        "save_wav": False,
+        "max_buffer_seconds": 600,
+        "source": "microphone",
+        "source_file": "",
+        "realtime": True,
+        "downmix": "mean",
+        "preroll_ms": 0,
+        "keep_warm": True,
+        "start_timeout_ms": 5000,
+        "capture_mode": "callback",
+        "queue_chunks": 64
+    },
+    "output": {
+        "method": "auto",
+        "paste_min_chars": 80,
+        "restore_clipboard": True,
+        "restore_delay_ms": 300
     },
     "ui": {
         "indicator_size": 12,
         "indicator_color": "red",
         "transparency": 0.7
+    },
+    "vad": {
+        "enabled": True,
+        "threshold_db": -50,
+        "margin_db": 10,
+        "padding_ms": 200,
+        "min_speech_ms": 150
+    },
+    "model_cache": {
+        "max_memory_mb": 4096,
+        "prefetch": True,
+        "idle_unload_minutes": 30
+    },
+    "tracing": {
+        "enabled": True,
+        "file": "assets/traces.jsonl",
+        "max_bytes": 1000000,
+        "backups": 3
+    },
+    "worker": {
+        "max_queue": 4,
+        "when_full": "drop_oldest",
+        "max_wait_seconds": 60
+    },
+    "two_pass": {
+        "enabled": False,
+        "draft_model": "tiny"
+    },
+    "streaming": {
+        "enabled": False,
+        "step_seconds": 1.0,
+        "min_seconds": 1.0,
+        "max_window_seconds": 15,
+        "live_output": "off"
     }
 }
 
@@ -87,14 +155,37 @@ DEFAULT_CONFIG = {
 config = {}
 recording = False
 audio_thread = None
-stream = None
+audio_source = None
 audio = None
-frames = []
+standing_source = None  # Always-open input stream when pre-roll is on
+stream_pool = None  # Paused input stream kept between recordings
+capture_lock = threading.Lock()  # One recording at a time owns the input stream
+capture_buffer = None
+streamer = None
+transcription_worker = None
+model_lock = threading.Lock()
+model_ready = threading.Event()
+model_failed = threading.Event()  # Last load failed; queued recordings stop waiting for it
+model_cache = None
+model_loading = threading.Lock()
+last_activity_time = time.time()
+startup_times = {}
 indicator = None
 settings_window = None
 hotkey_pressed = False
 hotkey_active = False
 last_keydown_time = 0
+hotkey_down_at = None
+hotkey_up_at = None
+hotkey_latency_ms = None
+hotkey_backend = None
+hotkey_matcher = None
+held_modifiers = 0
+hotkey_wanted = False
+hotkey_signal = threading.Event()
+current_trace = None
+trace_logger = None
+recent_latencies = deque(maxlen=200)
 max_hotkey_duration = 30  # Maximum recording duration in seconds before auto-stop
 model = None
 model_name = None
@@ -102,26 +193,53 @@ model_name = None
 # Virtual key codes and Windows constants
 VK_CONTROL = 0x11
 VK_SHIFT = 0x10
+VK_LSHIFT = 0xA0
+VK_RSHIFT = 0xA1
+VK_LCONTROL = 0xA2
+VK_RCONTROL = 0xA3
 WH_KEYBOARD_LL = 13
 WM_KEYDOWN = 0x0100
 WM_KEYUP = 0x0101
+WM_SYSKEYDOWN = 0x0104
+WM_SYSKEYUP = 0x0105
+LLKHF_INJECTED = 0x10
 
-# Windows-specific user32.dll functions for keyboard interception
-user32 = ctypes.WinDLL('user32', use_last_error=True)
-
-# Define correct argument types for user32 functions
-user32.SetWindowsHookExW.argtypes = (ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint)
-user32.SetWindowsHookExW.restype = ctypes.c_void_p
-user32.CallNextHookEx.argtypes = (ctypes.c_void_p, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
-user32.CallNextHookEx.restype = ctypes.c_int
-user32.GetMessageW.argtypes = (ctypes.POINTER(wintypes.MSG), ctypes.c_void_p, ctypes.c_uint, ctypes.c_uint)
-user32.GetMessageW.restype = ctypes.c_int
-user32.TranslateMessage.argtypes = (ctypes.POINTER(wintypes.MSG),)
-user32.TranslateMessage.restype = ctypes.c_int
-user32.DispatchMessageW.argtypes = (ctypes.POINTER(wintypes.MSG),)
-user32.DispatchMessageW.restype = wintypes.LPARAM
-user32.GetAsyncKeyState.argtypes = (ctypes.c_int,)
-user32.GetAsyncKeyState.restype = ctypes.c_short
+# Bit per physical modifier key, so left and right keys are tracked separately
+MODIFIER_BITS = {VK_LCONTROL: 1, VK_RCONTROL: 2, VK_CONTROL: 4, VK_LSHIFT: 8, VK_RSHIFT: 16, VK_SHIFT: 32}
+CTRL_MASK = 1 | 2 | 4
+SHIFT_MASK = 8 | 16 | 32
+
+# Hotkey keys that are not a letter or digit: name -> (virtual key code, evdev key name).
+# F13-F24 exist on no standard layout, so mouse/macro buttons mapped to them make
+# hotkeys that need no modifiers and take no key away from typing.
+HOTKEY_NAMED_KEYS = {
+    **{f"f{n}": (0x6F + n, f"KEY_F{n}") for n in range(1, 25)},
+    "pause": (0x13, "KEY_PAUSE"),
+    "scrolllock": (0x91, "KEY_SCROLLLOCK"),
+    "insert": (0x2D, "KEY_INSERT"),
+    "menu": (0x5D, "KEY_COMPOSE"),
+}
+
+# Windows-specific user32.dll functions for keyboard interception. Elsewhere the
+# module still imports (for benchmarks and headless use) but has no hotkey hook.
+if sys.platform == "win32":
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+
+    # Define correct argument types for user32 functions
+    user32.SetWindowsHookExW.argtypes = (ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint)
+    user32.SetWindowsHookExW.restype = ctypes.c_void_p
+    user32.CallNextHookEx.argtypes = (ctypes.c_void_p, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+    user32.CallNextHookEx.restype = ctypes.c_int
+    user32.GetMessageW.argtypes = (ctypes.POINTER(wintypes.MSG), ctypes.c_void_p, ctypes.c_uint, ctypes.c_uint)
+    user32.GetMessageW.restype = ctypes.c_int
+    user32.TranslateMessage.argtypes = (ctypes.POINTER(wintypes.MSG),)
+    user32.TranslateMessage.restype = ctypes.c_int
+    user32.DispatchMessageW.argtypes = (ctypes.POINTER(wintypes.MSG),)
+    user32.DispatchMessageW.restype = wintypes.LPARAM
+    user32.GetAsyncKeyState.argtypes = (ctypes.c_int,)
+    user32.GetAsyncKeyState.restype = ctypes.c_short
+else:
+    user32 = None
 
 # Keyboard hook structure
 class KBDLLHOOKSTRUCT(ctypes.Structure):
@@ -133,6 +251,8 @@ class KBDLLHOOKSTRUCT(ctypes.Structure):
         ('dwExtraInfo', ctypes.POINTER(ctypes.c_ulong))
     ]
 
+FLAGS_OFFSET = KBDLLHOOKSTRUCT.flags.offset
+
 # Prototype for the hook function
 LowLevelKeyboardProc = ctypes.CFUNCTYPE(
     ctypes.c_int,          # Return type
@@ -161,7 +281,7 @@ def load_config():
     if config_path.exists():
         try:
             with open(config_path, "r") as f:
-                config = json.load(f)
+                config = merge_config(json.load(f), DEFAULT_CONFIG)
             print(f"✓ Configuration loaded from {CONFIG_FILE}")
         except Exception as e:
             print(f"! Error reading config file: {e}")
@@ -171,8 +291,31 @@ def load_config():
         config = DEFAULT_CONFIG
         save_config()
     
+    try:
+        compile_hotkey()
+    except ValueError as e:
+        print(f"! {e}, using '{DEFAULT_CONFIG['hotkey']['key']}'")
+        config["hotkey"]["key"] = DEFAULT_CONFIG["hotkey"]["key"]
+        compile_hotkey()
+    hotkey_cfg = config["hotkey"]
+    if not (hotkey_cfg["ctrl"] or hotkey_cfg["shift"]) and hotkey_cfg["key"].lower() not in HOTKEY_NAMED_KEYS:
+        print(f"! Hotkey '{hotkey_cfg['key']}' without Ctrl/Shift fires whenever that key is typed; "
+              "a key like 'f13' avoids that")
+    if config["streaming"]["live_output"] != "off" and live_output_mode() == "off":
+        print("! streaming.live_output needs a hotkey without Ctrl/Shift (e.g. 'f13'), "
+              "typing after release instead")
     return config
 
+def merge_config(loaded, defaults):
+    """Fill in any settings missing from a loaded config with their defaults."""
+    merged = dict(loaded)
+    for key, value in defaults.items():
+        if isinstance(value, dict):
+            merged[key] = merge_config(loaded.get(key) or {}, value)
+        elif key not in merged:
+            merged[key] = value
+    return merged
+
 def save_config():
     """Save current configuration to file."""
     try:
@@ -181,10 +324,267 @@ def save_config():
     except Exception as e:
         print(f"! Error saving config: {e}")
 
+# ============= Transcription Backends =============
+
+class WhisperBackend:
+    """openai-whisper engine (PyTorch, FP32 on CPU)."""
+    engine = "openai-whisper"
+    
+    def __init__(self, name):
+        import whisper
+        import torch
+        
+        if config["backend"]["cpu_threads"]:
+            torch.set_num_threads(config["backend"]["cpu_threads"])
+        self.name = name
+        self.model = whisper.load_model(name)
+    
+    def transcribe(self, audio_data, language=None, prompt=None):
+        """Transcribe float32 16 kHz samples. Returns {"text", "segments"}."""
+        return self.model.transcribe(audio_data, language=language, initial_prompt=prompt)
+
+class FasterWhisperBackend:
+    """CTranslate2 engine via faster-whisper, int8-quantized on CPU by default."""
+    engine = "faster-whisper"
+    
+    def __init__(self, name):
+        from faster_whisper import WhisperModel
+        
+        backend_cfg = config["backend"]
+        self.name = name
+        self.model = WhisperModel(
+            name,
+            device="cpu",
+            compute_type=backend_cfg["compute_type"],
+            cpu_threads=backend_cfg["cpu_threads"]
+        )
+    
+    def transcribe(self, audio_data, language=None, prompt=None):
+        """Transcribe float32 16 kHz samples. Returns {"text", "segments"}."""
+        # Greedy decoding, matching openai-whisper's transcribe() default
+        segments, _ = self.model.transcribe(
+            audio_data, language=language, initial_prompt=prompt, beam_size=1
+        )
+        segments = [{"text": s.text, "start": s.start, "end": s.end} for s in segments]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+# Available engines, selectable with config["backend"]["engine"]
+BACKENDS = {
+    WhisperBackend.engine: WhisperBackend,
+    FasterWhisperBackend.engine: FasterWhisperBackend,
+}
+
+# Engines whose package failed to import; models load with openai-whisper instead
+unavailable_engines = set()
+
+def active_engine():
+    """Engine models actually load with: the configured one unless it is unknown or unavailable."""
+    engine = config["backend"]["engine"]
+    if engine in BACKENDS and engine not in unavailable_engines:
+        return engine
+    return WhisperBackend.engine
+
+# ============= Model Cache =============
+
+# Rough resident size of each model with openai-whisper in FP32, used to decide
+# whether a prefetch fits before the real size has been measured
+MODEL_MEMORY_MB = {"tiny": 150, "base": 300, "small": 1000, "medium": 3000, "large-v3": 6500}
+
+def process_rss_mb():
+    """Resident memory of this process in MB, or None if psutil is unavailable."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return None
+
+def estimate_model_mb(name):
+    """Estimated resident size of a model with the configured backend."""
+    estimate = MODEL_MEMORY_MB.get(name, 1000)
+    if active_engine() == "faster-whisper" and config["backend"]["compute_type"].startswith("int8"):
+        estimate /= 3
+    return estimate
+
+class ModelCache:
+    """Keeps recently used models resident within a RAM budget (LRU eviction).
+    
+    Models are keyed by (name, engine, compute_type), so switching back to a
+    model that is still cached is instant. After each switch the model most
+    often selected next is prefetched in the background if it fits the budget.
+    """
+    def __init__(self, max_memory_mb=4096, prefetch=True):
+        self.max_memory_mb = max_memory_mb
+        self.prefetch_enabled = prefetch
+        self.models = OrderedDict()  # key -> (backend, size_mb), least recent first
+        self.loading = {}            # key -> Event set when an in-flight load finishes
+        self.transitions = Counter() # (from_name, to_name) -> number of switches
+        self.lock = threading.Lock()
+    
+    def key(self, name):
+        """Cache key for a model name under the current backend settings."""
+        return (name, active_engine(), config["backend"]["compute_type"])
+    
+    def used_mb(self):
+        """Memory held by cached models."""
+        return sum(size for _, size in self.models.values())
+    
+    def get(self, name, on_status=None):
+        """Return a loaded model, loading it (and evicting others) if needed."""
+        key = self.key(name)
+        while True:
+            with self.lock:
+                if key in self.models:
+                    self.models.move_to_end(key)
+                    return self.models[key][0]
+                pending = self.loading.get(key)
+                if pending is None:
+                    pending = self.loading[key] = threading.Event()
+                    break
+            # Another thread (usually a prefetch) is loading it; wait and re-check
+            if on_status:
+                on_status(f"Loading {name} model...")
+            pending.wait()
+        
+        try:
+            before = process_rss_mb()
+            loaded_model = load_whisper_model(name, on_status)
+            after = process_rss_mb()
+            size = after - before if before is not None and after > before else estimate_model_mb(name)
+            # Re-key in case the configured engine was unavailable and loading fell back
+            loaded_key = self.key(name)
+            with self.lock:
+                self.models[loaded_key] = (loaded_model, size)
+                self.evict(keep=loaded_key)
+            return loaded_model
+        finally:
+            with self.lock:
+                self.loading.pop(key).set()
+    
+    def evict(self, keep):
+        """Drop least recently used models until the cache fits its budget (lock held)."""
+        while self.used_mb() > self.max_memory_mb:
+            # Never evict the model being returned or the one currently in use
+            victim = next((k for k, (m, _) in self.models.items() if k != keep and m is not model), None)
+            if victim is None:
+                break
+            _, size = self.models.pop(victim)
+            print(f"• Evicted {victim[0]} model from cache ({size:.0f} MB)")
+        gc.collect()
+    
+    def clear(self):
+        """Drop every cached model."""
+        with self.lock:
+            self.models.clear()
+    
+    def trim(self):
+        """Re-apply the budget, e.g. once the previously active model is no longer in use."""
+        with self.lock:
+            self.evict(keep=None)
+    
+    def record_switch(self, old_name, new_name):
+        """Remember a model switch so the next likely model can be prefetched."""
+        if old_name and old_name != new_name:
+            self.transitions[(old_name, new_name)] += 1
+    
+    def predict_next(self, name):
+        """Model most often switched to from `name`, if any."""
+        candidates = [(count, to) for (frm, to), count in self.transitions.items() if frm == name]
+        return max(candidates)[1] if candidates else None
+    
+    def prefetch(self, name):
+        """Load a model in the background if it is not cached and fits without evicting."""
+        if not self.prefetch_enabled or not name:
+            return
+        key = self.key(name)
+        with self.lock:
+            if key in self.models or key in self.loading:
+                return
+            if self.used_mb() + estimate_model_mb(name) > self.max_memory_mb:
+                return
+        print(f"→ Prefetching {name} model")
+        threading.Thread(target=self._prefetch, args=(name,), daemon=True).start()
+    
+    def _prefetch(self, name):
+        try:
+            self.get(name)
+            # Prefetched but not used yet: first in line for eviction
+            with self.lock:
+                self.models.move_to_end(self.key(name), last=False)
+        except Exception as e:
+            print(f"! Error prefetching {name} model: {e}")
+
+def activate_model(on_status=None):
+    """Make the configured model the active one, loading it unless it is cached."""
+    global model, model_cache, model_name
+    
+    if model_cache is None:
+        cache_cfg = config["model_cache"]
+        model_cache = ModelCache(cache_cfg["max_memory_mb"], cache_cfg["prefetch"])
+    
+    name = config.get("model", "tiny")
+    model_failed.clear()
+    model = model_cache.get(name, on_status)
+    model_cache.trim()
+    model_cache.record_switch(model_name, name)
+    model_name = name
+    model_ready.set()
+    model_cache.prefetch(model_cache.predict_next(name))
+    
+    # Keep the two-pass draft model loaded alongside the main one
+    draft_name = config["two_pass"]["draft_model"]
+    if config["two_pass"]["enabled"] and draft_name != name:
+        threading.Thread(target=model_cache.get, args=(draft_name,), daemon=True).start()
+    return model
+
+def unload_idle_model():
+    """Release the model after a period without recordings, reporting memory freed."""
+    global model
+    
+    with model_lock:
+        if not model_ready.is_set() or recording or transcription_worker.busy:
+            return
+        before = process_rss_mb()
+        model_ready.clear()
+        model = None
+        model_cache.clear()
+        gc.collect()
+        after = process_rss_mb()
+    
+    if before is not None:
+        print(f"• Unloaded idle model (resident memory {before:.0f} MB → {after:.0f} MB)")
+    else:
+        print("• Unloaded idle model")
+    indicator.set_idle_status("Idle (model unloaded)")
+
+def ensure_model_loaded():
+    """Reload an unloaded model in the background, e.g. as soon as the hotkey goes down.
+    
+    The load overlaps with the user speaking; the recording waits in the
+    transcription queue until model_ready is set.
+    """
+    if model_ready.is_set() or not model_loading.acquire(blocking=False):
+        return
+    
+    def reload():
+        try:
+            start = time.perf_counter()
+            activate_model(on_status=indicator.set_idle_status)
+            print(f"✓ Model reloaded in {time.perf_counter() - start:.2f}s")
+            indicator.set_idle_status("Ready")
+        except Exception as e:
+            print(f"! Error reloading model: {e}")
+            model_load_failed()
+        finally:
+            model_loading.release()
+    
+    threading.Thread(target=reload, daemon=True).start()
+
 # ============= Audio Functions =============
 
 def get_audio_format():
     """Convert string format from config to PyAudio format constant."""
+    import pyaudio
+    
     format_str = config["audio"]["format"]
     if format_str == "paInt16":
         return pyaudio.paInt16
@@ -197,134 +597,1481 @@ def get_audio_format():
     else:
         return pyaudio.paInt16  # Default
 
-def load_whisper_model():
-    """Load the Whisper model specified in the configuration."""
-    global model_name
+# Bytes per sample for each supported capture format (unknown names fall back to paInt16)
+SAMPLE_WIDTHS = {"paInt16": 2, "paInt24": 3, "paInt32": 4, "paFloat32": 4}
+
+def sample_width(sample_format):
+    """Bytes per sample of a config["audio"]["format"] name."""
+    return SAMPLE_WIDTHS.get(sample_format, 2)
+
+def convert_samples(data, sample_format, out):
+    """Convert interleaved PCM bytes to float32 in [-1, 1], written into out.
     
-    model_name = config.get("model", "tiny")
-    print(f"→ Loading Whisper model: {model_name}...")
+    Handles little-endian int16, packed int24, int32 and float32. Converts
+    len(out) samples (data may hold more); each is a single vectorized pass.
+    """
+    count = len(out)
+    if sample_format == "paFloat32":
+        out[:] = np.frombuffer(data, dtype=np.float32, count=count)
+    elif sample_format == "paInt32":
+        np.multiply(np.frombuffer(data, dtype=np.int32, count=count),
+                    np.float32(1.0 / 2**31), out=out, dtype=np.float32)
+    elif sample_format == "paInt24":
+        # Place each 3-byte sample in the top of an int32 so the sign comes for free
+        packed = np.frombuffer(data, dtype=np.uint8, count=count * 3).reshape(count, 3)
+        widened = np.zeros((count, 4), dtype=np.uint8)
+        widened[:, 1:] = packed
+        np.multiply(widened.view("<i4").ravel(), np.float32(1.0 / 2**31), out=out, dtype=np.float32)
+    else:
+        np.multiply(np.frombuffer(data, dtype=np.int16, count=count),
+                    np.float32(1.0 / 32768.0), out=out, dtype=np.float32)
+    return out
+
+class Resampler:
+    """Streaming polyphase resampler from in_rate to out_rate.
     
-    # Load the model
-    loaded_model = whisper.load_model(model_name)
-    print(f"✓ Model loaded")
+    A Kaiser-windowed sinc low-pass is split into `up` phases. Each output
+    sample is one dot product of a phase with the most recent input frames, so
+    a chunk can be resampled as soon as it arrives. The last few input frames
+    are carried over to the next chunk, so the output is the same as for one
+    long array.
+    """
+    def __init__(self, in_rate, out_rate, channels=1, zero_crossings=16):
+        g = math.gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.channels = channels
+        
+        # Cut off a little below the lower Nyquist frequency, in units of the upsampled rate
+        factor = max(self.up, self.down)
+        self.taps = int(math.ceil(2 * zero_crossings * factor / self.up))
+        n = self.taps * self.up
+        t = np.arange(n) - (n - 1) / 2
+        cutoff = 0.475 / factor
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, 8.0) * self.up
+        # phases[p, k] = h[k * up + p]
+        self.phases = np.ascontiguousarray(h.reshape(self.taps, self.up).T, dtype=np.float32)
+        self.offsets = np.arange(self.taps)
+        self.reset()
     
-    return loaded_model
+    def reset(self):
+        self.history = np.zeros((self.taps - 1, self.channels), dtype=np.float32)
+        self.frames_in = 0
+        self.frames_out = 0
+    
+    def process(self, samples):
+        """Resample a chunk of interleaved float32 samples; returns interleaved float32 output."""
+        frames = samples.reshape(-1, self.channels)
+        block = np.concatenate((self.history, frames))
+        total = self.frames_in + len(frames)
+        
+        # Every output whose newest input frame has arrived
+        n = np.arange(self.frames_out, (total * self.up - 1) // self.down + 1)
+        position = n * self.down
+        newest = position // self.up - self.frames_in + self.taps - 1
+        window = block[newest[:, None] - self.offsets]
+        out = np.einsum("nk,nkc->nc", self.phases[position % self.up], window)
+        
+        self.history = block[len(block) - (self.taps - 1):]
+        self.frames_in = total
+        self.frames_out += len(n)
+        return out.ravel()
+
+# ============= Audio Sources =============
 
-def record_audio():
-    """Records audio while hotkey is held."""
-    global recording, frames, stream, audio
+class AudioSource:
+    """Where recorded audio comes from.
     
-    # Get audio settings from config
-    chunk = config["audio"]["chunk"]
-    channels = config["audio"]["channels"]
-    rate = config["audio"]["rate"]
-    audio_format = get_audio_format()
+    read(frames) returns up to `frames` frames of interleaved PCM bytes in
+    sample_format, and b"" once the source is exhausted (a live microphone
+    never is).
+    """
+    rate = WHISPER_RATE
+    channels = 1
+    sample_format = "paInt16"
+    failed = False  # Set when the device stopped delivering audio
     
-    frames = []  # Reset frames
+    def open(self):
+        pass
     
-    try:
-        # Open audio stream
-        stream = audio.open(
-            format=audio_format,
-            channels=channels,
-            rate=rate,
+    def read(self, frames):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+    
+    def drain(self):
+        """Audio still buffered after close(), as bytes."""
+        return b""
+    
+    def stats(self):
+        """Capture health counters, if the source keeps any."""
+        return {}
+
+class PyAudioSource(AudioSource):
+    """Live input device through PyAudio.
+    
+    In "callback" mode PortAudio's own thread hands each chunk to a bounded
+    deque (one producer, one consumer, no lock) and read() takes chunks off the
+    other end, so a busy transcription thread can delay reads without the
+    driver dropping audio. "blocking" mode keeps the old stream.read() loop.
+    
+    With preroll_ms, start_standing() opens the stream once and keeps it
+    running: between recordings the callback only keeps the last preroll_ms
+    of audio in a ring, and open()/close() just start and stop queueing, with
+    the ring's contents going first. Switching happens on the callback thread
+    itself, so no chunk is lost or reordered at the boundary.
+    
+    With keep_warm, close() only pauses the stream and the next open() resumes
+    it, which on some drivers is far cheaper than opening a new one.
+    """
+    def __init__(self, rate, channels, chunk, mode="callback", queue_chunks=64, sample_format="paInt16",
+                 preroll_ms=0, keep_warm=False, start_timeout_ms=5000):
+        self.rate = rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.chunk = chunk
+        self.mode = mode
+        self.queue_chunks = max(queue_chunks, 1)
+        self.stream = None
+        self.chunks = deque()
+        self.poll_interval = chunk / rate / 4
+        self.stall_timeout = max(1.0, 8 * chunk / rate)
+        # Some devices take seconds to deliver after a start (Bluetooth profile switch)
+        self.start_timeout = max(start_timeout_ms / 1000, self.stall_timeout)
+        self.delivered = False
+        self.preroll = deque(maxlen=max(math.ceil(preroll_ms / 1000 * rate / chunk), 1))
+        if preroll_ms:
+            self.queue_chunks = max(self.queue_chunks, self.preroll.maxlen * 2)  # Room for the ring plus new audio
+        self.standing = False
+        self.keep_warm = keep_warm
+        self.resumed = False
+        self.capture_requested = False
+        self.capturing = False
+        self.prerolled_chunks = 0
+        self.reset_stats()
+    
+    def reset_stats(self):
+        self.dropped_chunks = 0     # Queue full: the reader fell behind
+        self.input_overflows = 0    # PortAudio lost input before the callback ran
+        self.input_underflows = 0   # PortAudio padded the input with silence
+        self.max_queue_depth = 0
+    
+    def open(self):
+        self.failed = False
+        self.delivered = False
+        self.chunks.clear()
+        self.reset_stats()
+        self.prerolled_chunks = 0
+        self.capture_requested = True
+        if self.standing:
+            return  # Already running; the next callback starts queueing
+        self.capturing = True
+        self.resumed = False
+        if self.stream:
+            try:
+                self.stream.start_stream()
+                self.resumed = True
+                return
+            except (IOError, OSError) as e:
+                print(f"! Could not resume input stream, reopening: {e}")
+                self.shutdown()
+        try:
+            self._open_stream()
+        except Exception:
+            self.failed = True
+            raise
+    
+    def start_standing(self):
+        """Open the stream now and keep it open, filling the pre-roll ring until open()."""
+        self.standing = True
+        self.capture_requested = self.capturing = False
+        self._open_stream()
+    
+    def _open_stream(self):
+        import pyaudio
+        
+        # Set before opening: PortAudio may call back before open() returns
+        self.continue_flag = pyaudio.paContinue
+        self.overflow_flag = pyaudio.paInputOverflow
+        self.underflow_flag = pyaudio.paInputUnderflow
+        callback = self._on_audio if self.mode == "callback" else None
+        self.stream = audio.open(
+            format=get_audio_format(),
+            channels=self.channels,
+            rate=self.rate,
             input=True,
-            frames_per_buffer=chunk
+            frames_per_buffer=self.chunk,
+            stream_callback=callback
         )
+    
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """Runs on PortAudio's thread: queue the chunk and return immediately."""
+        if self.capturing != self.capture_requested:
+            if self.capture_requested:
+                # Recording starts with the audio from just before the hotkey
+                self.prerolled_chunks = len(self.preroll)
+                self.chunks.extend(self.preroll)
+                self.preroll.clear()
+            self.capturing = self.capture_requested
+        if not self.capturing:
+            self.preroll.append(in_data)
+            return None, self.continue_flag
         
-        # Record audio while the hotkey is pressed
-        while recording:
+        if status:
+            if status & self.overflow_flag:
+                self.input_overflows += 1
+            if status & self.underflow_flag:
+                self.input_underflows += 1
+        depth = len(self.chunks)
+        if depth >= self.queue_chunks:
+            self.dropped_chunks += 1
+        else:
+            self.chunks.append(in_data)
+            if depth >= self.max_queue_depth:
+                self.max_queue_depth = depth + 1
+        return None, self.continue_flag
+    
+    def read(self, frames):
+        if self.mode != "callback":
+            return self.stream.read(frames, exception_on_overflow=False)
+        
+        # Wait for the callback to deliver; b"" if the device stopped or went silent.
+        # The first chunk after open()/resume gets the longer start timeout.
+        timeout = self.stall_timeout if self.delivered else self.start_timeout
+        deadline = time.perf_counter() + timeout
+        while not self.chunks:
+            if not self.stream.is_active() or time.perf_counter() > deadline:
+                print(f"! No audio from the input device for {timeout:.1f}s, stopping")
+                self.failed = True
+                return b""
+            time.sleep(self.poll_interval)
+        self.delivered = True
+        return self.chunks.popleft()
+    
+    def close(self):
+        if self.failed:
+            self.shutdown()  # Never resume a stream that stalled
+            return
+        if self.standing and self.stream:
+            # Wait for the callback to switch back to the ring, so drain()
+            # gets everything up to the release and nothing after it
+            self.capture_requested = False
+            deadline = time.perf_counter() + 4 * self.chunk / self.rate
+            while self.capturing and self.stream.is_active() and time.perf_counter() < deadline:
+                time.sleep(self.poll_interval)
+            self.capturing = False
+            return
+        if self.keep_warm and self.stream:
+            self.stream.stop_stream()  # Pause; open() resumes it
+            return
+        self.shutdown()
+    
+    def shutdown(self):
+        """Stop and close the stream, standing or not."""
+        self.standing = False
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+    
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+    
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "dropped_chunks": self.dropped_chunks,
+            "input_overflows": self.input_overflows,
+            "input_underflows": self.input_underflows,
+            "max_queue_depth": self.max_queue_depth,
+            "preroll_ms": round(self.prerolled_chunks * self.chunk / self.rate * 1000),
+            "stream": "standing" if self.standing else "resumed" if self.resumed else "opened",
+            "failed": self.failed,
+        }
+
+class PacedSource(AudioSource):
+    """Base for non-live sources: optionally paces reads to real time."""
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self.frames_read = 0
+        self.started = None
+    
+    def open(self):
+        self.frames_read = 0
+        self.started = time.perf_counter()
+    
+    def pace(self, frames):
+        """Sleep until `frames` more frames would have been captured by a real device."""
+        self.frames_read += frames
+        if self.realtime:
+            delay = self.started + self.frames_read / self.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+class FileAudioSource(PacedSource):
+    """Replays a 16/24/32-bit WAV file, or raw int16 PCM at the configured rate/channels."""
+    def __init__(self, path, realtime=True, rate=WHISPER_RATE, channels=1):
+        super().__init__(realtime)
+        self.path = str(path)
+        self.rate = rate
+        self.channels = channels
+        self.wav = None
+        self.raw = None
+        if self.path.lower().endswith(".wav"):
+            with wave.open(self.path, "rb") as wf:
+                formats = {2: "paInt16", 3: "paInt24", 4: "paInt32"}
+                if wf.getsampwidth() not in formats:
+                    raise ValueError(f"{self.path}: only 16, 24 and 32-bit WAV files are supported")
+                self.sample_format = formats[wf.getsampwidth()]
+                self.rate = wf.getframerate()
+                self.channels = wf.getnchannels()
+    
+    def open(self):
+        super().open()
+        if self.path.lower().endswith(".wav"):
+            self.wav = wave.open(self.path, "rb")
+        else:
+            self.raw = open(self.path, "rb")
+    
+    def read(self, frames):
+        if self.wav:
+            data = self.wav.readframes(frames)
+        else:
+            data = self.raw.read(frames * self.channels * 2)
+        self.pace(len(data) // (self.channels * sample_width(self.sample_format)))
+        return data
+    
+    def close(self):
+        for handle in (self.wav, self.raw):
+            if handle:
+                handle.close()
+        self.wav = self.raw = None
+
+class SyntheticAudioSource(PacedSource):
+    """Generates speech-like audio: silence, a syllable-modulated voiced tone, silence."""
+    def __init__(self, seconds=3.0, lead=0.5, tail=0.5, realtime=True, rate=WHISPER_RATE, channels=1):
+        super().__init__(realtime)
+        self.rate = rate
+        self.channels = channels
+        total = int((lead + seconds + tail) * rate)
+        t = np.arange(total) / rate
+        
+        # 150 Hz fundamental plus harmonics, gated to the speech window and
+        # amplitude-modulated at ~4 syllables per second, over a low noise floor
+        voiced = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t)) * ((t >= lead) & (t < lead + seconds))
+        noise = np.random.default_rng(0).normal(0, 0.003, total)
+        signal = 0.2 * voiced * envelope + noise
+        
+        pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+        self.pcm = np.repeat(pcm, channels).tobytes()
+        self.position = 0
+    
+    def open(self):
+        super().open()
+        self.position = 0
+    
+    def read(self, frames):
+        size = frames * self.channels * 2
+        data = self.pcm[self.position:self.position + size]
+        self.position += len(data)
+        self.pace(len(data) // (self.channels * 2))
+        return data
+
+def capture_rate():
+    """Sample rate to capture at: audio.rate, or the input device's own rate for "native"."""
+    rate = config["audio"]["rate"]
+    if rate != "native":
+        return int(rate)
+    if config["audio"]["source"] != "microphone" or audio is None:
+        return WHISPER_RATE
+    try:
+        return int(audio.get_default_input_device_info()["defaultSampleRate"])
+    except (IOError, OSError, KeyError) as e:
+        print(f"! Could not read the input device's sample rate, using {WHISPER_RATE} Hz: {e}")
+        return WHISPER_RATE
+
+def create_audio_source(pooled=True):
+    """Build the audio source selected by config["audio"]["source"].
+    
+    Microphone sources come from the stream pool when audio.keep_warm is on,
+    unless pooled is False.
+    """
+    global stream_pool
+    
+    audio_cfg = config["audio"]
+    kind = audio_cfg["source"]
+    if kind == "file":
+        return FileAudioSource(audio_cfg["source_file"], realtime=audio_cfg["realtime"],
+                               rate=capture_rate(), channels=audio_cfg["channels"])
+    if kind == "synthetic":
+        return SyntheticAudioSource(realtime=audio_cfg["realtime"],
+                                    rate=capture_rate(), channels=audio_cfg["channels"])
+    if standing_source:
+        return standing_source
+    
+    rate = capture_rate()
+    settings = (rate, audio_cfg["channels"], audio_cfg["chunk"], audio_cfg["format"],
+                audio_cfg["capture_mode"], audio_cfg["queue_chunks"], audio_cfg["preroll_ms"])
+    
+    def build():
+        return PyAudioSource(rate, audio_cfg["channels"], audio_cfg["chunk"],
+                             mode=audio_cfg["capture_mode"], queue_chunks=audio_cfg["queue_chunks"],
+                             sample_format=audio_cfg["format"], preroll_ms=audio_cfg["preroll_ms"],
+                             keep_warm=audio_cfg["keep_warm"], start_timeout_ms=audio_cfg["start_timeout_ms"])
+    
+    if not pooled:
+        return build()
+    if stream_pool is None:
+        stream_pool = StreamPool()
+    if audio_cfg["keep_warm"]:
+        return stream_pool.get(settings, build)
+    stream_pool.close()
+    return build()
+
+class StreamPool:
+    """Keeps the last microphone source, and its paused stream, between recordings.
+    
+    The source is reused while the capture settings stay the same; any change
+    closes it and a fresh one is opened. PortAudio only lists devices when it
+    initializes, so an unplugged or replaced device shows up as a failed
+    recording instead, and restart_audio() starts over with a new device list.
+    """
+    def __init__(self):
+        self.settings = None
+        self.source = None
+    
+    def get(self, settings, build):
+        """The pooled source for these settings, building a new one if they changed."""
+        if self.source is None or settings != self.settings:
+            self.close()
+            self.source = build()
+            self.settings = settings
+        return self.source
+    
+    def close(self):
+        """Close the pooled stream, if any."""
+        if self.source:
+            self.source.shutdown()
+        self.source = None
+        self.settings = None
+
+def start_preroll():
+    """Open the always-on input stream that keeps the last audio.preroll_ms of sound."""
+    global standing_source
+    
+    audio_cfg = config["audio"]
+    if not audio_cfg["preroll_ms"] or audio_cfg["source"] != "microphone":
+        return
+    if audio_cfg["capture_mode"] != "callback":
+        print("! Pre-roll needs audio.capture_mode \"callback\", disabling it")
+        return
+    source = create_audio_source(pooled=False)
+    try:
+        source.start_standing()
+    except Exception as e:
+        print(f"! Error opening pre-roll stream: {e}")
+        return
+    standing_source = source
+    print(f"✓ Pre-roll: keeping the last {audio_cfg['preroll_ms']} ms of audio")
+
+def restart_audio():
+    """Re-initialize PyAudio after the input device failed, so a new default device is found."""
+    global audio, standing_source
+    import pyaudio
+    
+    print("→ Re-initializing audio devices...")
+    if stream_pool:
+        stream_pool.close()
+    had_preroll = standing_source is not None
+    if standing_source:
+        standing_source.shutdown()
+        standing_source = None
+    try:
+        audio.terminate()
+    except Exception as e:
+        print(f"! Error closing audio: {e}")
+    audio = pyaudio.PyAudio()
+    if had_preroll:
+        start_preroll()
+
+# ============= Model Loading =============
+
+def load_whisper_model(name=None, on_status=None):
+    """Load a Whisper model (the one in the configuration by default).
+    
+    on_status, if given, is called with short progress messages for the UI.
+    """
+    name = name or config.get("model", "tiny")
+    engine = config["backend"]["engine"]
+    if engine not in BACKENDS:
+        print(f"! Unknown backend '{engine}', using openai-whisper")
+    backend_class = BACKENDS[active_engine()]
+    
+    print(f"→ Loading Whisper model: {name} ({backend_class.engine})...")
+    if on_status:
+        on_status(f"Loading {name} model...")
+    
+    # Load the model
+    try:
+        loaded_model = backend_class(name)
+    except ImportError as e:
+        print(f"! {backend_class.engine} is not available ({e}), using openai-whisper")
+        unavailable_engines.add(backend_class.engine)
+        loaded_model = WhisperBackend(name)
+    print("✓ Model loaded")
+    
+    if config["backend"]["warmup"]:
+        if on_status:
+            on_status(f"Warming up {name} model...")
+        warm_up_model(loaded_model)
+    
+    return loaded_model
+
+def load_initial_model():
+    """Load the configured model in the background after the UI and hook are up.
+    
+    Recordings made while this runs wait in the transcription queue and are
+    transcribed as soon as model_ready is set.
+    """
+    # Pull in the typing module now, off the critical path of the first dictation
+    importlib.import_module("keyboard")
+    
+    # Holding model_loading stops a hotkey press from starting a second load
+    with model_loading:
+        with timed("model"):
             try:
-                data = stream.read(chunk, exception_on_overflow=False)
-                frames.append(data)
-            except OSError as e:
-                print(f"! Audio buffer overflow: {str(e)}")
-                time.sleep(0.01)
-            
+                activate_model(on_status=indicator.set_idle_status)
+            except Exception as e:
+                print(f"! Error loading model: {e}")
+                if config["model"] == "tiny":
+                    model_load_failed()
+                    return
+                # Fall back to the smallest model rather than leaving dictation dead
+                print("→ Falling back to tiny model")
+                config["model"] = "tiny"
+                indicator.root.after(0, indicator.update_model_info)
+                try:
+                    activate_model(on_status=indicator.set_idle_status)
+                except Exception as e:
+                    print(f"! Error loading fallback model: {e}")
+                    model_load_failed()
+                    return
+    
+    print(f"✓ Ready ({format_startup_times()})")
+    indicator.set_idle_status("Ready")
+    indicator.root.after(0, lambda: indicator.model_dropdown.config(state="readonly"))
+
+def model_load_failed():
+    """Give up on a model load: fail recordings waiting for it and let another model be picked."""
+    model_failed.set()
+    indicator.set_idle_status("Model failed to load")
+    indicator.root.after(0, lambda: indicator.model_dropdown.config(state="readonly"))
+
+def warm_up_model(loaded_model):
+    """Run a short synthetic clip through the decode path so the first dictation is fast.
+    
+    The first transcribe() call pays for lazy allocations, kernel selection, mel
+    filterbank loading and tokenizer construction; doing it here moves that cost
+    to load time.
+    """
+    # One second of quiet noise with a voice-band tone, at Whisper's 16 kHz
+    rng = np.random.default_rng(0)
+    t = np.arange(WHISPER_RATE, dtype=np.float32) / WHISPER_RATE
+    clip = (0.05 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 0.005, t.size)).astype(np.float32)
+    
+    start = time.perf_counter()
+    try:
+        loaded_model.transcribe(clip, language=config["language"])
+        print(f"✓ Model warmed up in {time.perf_counter() - start:.2f}s")
     except Exception as e:
-        print(f"! Error during recording: {str(e)}")
-    finally:
-        if stream:
+        print(f"! Model warm-up failed: {e}")
+
+# ============= Audio Capture =============
+
+class CaptureBuffer:
+    """Growable float32 buffer that microphone chunks are converted into.
+    
+    Each chunk is converted from the capture format exactly once, straight into
+    preallocated storage. Storage doubles when full (up to max_samples), so the
+    finished recording is available as a view without joining or copying.
+    If out_rate differs from the capture rate, chunks are resampled as they
+    arrive and the buffer holds audio at out_rate.
+    
+    Multichannel input is reduced to mono. With downmix="mean" the channels are
+    averaged per chunk before resampling. With downmix="best" all channels are
+    kept, the speech energy of each is tracked per chunk, and view() returns a
+    strided view of the loudest channel.
+    """
+    def __init__(self, rate, channels=1, initial_seconds=5, max_seconds=600, sample_format="paInt16",
+                 out_rate=None, downmix="mean", speech_db=-50):
+        self.sample_format = sample_format
+        self.width = sample_width(sample_format)
+        self.channels = channels
+        self.downmix = downmix if channels > 1 else "mean"
+        self.stored_channels = channels if self.downmix == "best" else 1
+        self.speech_db = speech_db
+        self.channel_energy = np.zeros(self.stored_channels)
+        self.speech_energy = np.zeros(self.stored_channels)
+        self.rate = out_rate or rate
+        self.resampler = Resampler(rate, self.rate, self.stored_channels) if self.rate != rate else None
+        self.max_samples = int(max_seconds * self.rate * self.stored_channels)
+        initial = min(int(initial_seconds * self.rate * self.stored_channels), self.max_samples)
+        self.data = np.empty(max(initial, 1), dtype=np.float32)
+        self.length = 0
+        self.truncated = False
+        self.grow_count = 0
+        self.grow_bytes = 0
+    
+    def _reserve(self, extra):
+        """Make room for extra samples, growing geometrically. Returns whole frames' worth of samples available."""
+        needed = self.length + extra
+        if needed > len(self.data) and len(self.data) < self.max_samples:
+            new_size = min(max(needed, len(self.data) * 2), self.max_samples)
+            grown = np.empty(new_size, dtype=np.float32)
+            grown[:self.length] = self.data[:self.length]
+            self.grow_count += 1
+            self.grow_bytes += self.length * 4
+            self.data = grown
+        available = min(extra, len(self.data) - self.length)
+        return available - available % self.stored_channels
+    
+    def _mix_down(self, samples):
+        """Average interleaved channels into mono, reading each channel through a strided view."""
+        channels = [samples[c::self.channels] for c in range(self.channels)]
+        mono = np.add(channels[0], channels[1])
+        for channel in channels[2:]:
+            mono += channel
+        mono *= np.float32(1.0 / self.channels)
+        return mono
+    
+    def _measure(self, stored):
+        """Add a stored chunk's per-channel energy to the running totals."""
+        frames = stored.reshape(-1, self.stored_channels)
+        energy = np.einsum("ij,ij->j", frames, frames)
+        self.channel_energy += energy
+        if 10 * np.log10(energy.sum() / max(len(stored), 1) + 1e-10) > self.speech_db:
+            self.speech_energy += energy
+    
+    def best_channel(self):
+        """Index of the channel with the most speech energy so far."""
+        energy = self.speech_energy if self.speech_energy.any() else self.channel_energy
+        return int(np.argmax(energy))
+    
+    def append(self, data):
+        """Convert a chunk of PCM bytes and append it. Returns False once the cap is hit."""
+        samples = len(data) // self.width
+        if self.resampler is None and self.stored_channels == self.channels:
+            # Fast path: convert straight into storage
+            count = self._reserve(samples)
+            if count > 0:
+                convert_samples(data, self.sample_format, self.data[self.length:self.length + count])
+        else:
+            chunk = convert_samples(data, self.sample_format, np.empty(samples, dtype=np.float32))
+            if self.stored_channels != self.channels:
+                chunk = self._mix_down(chunk)
+            if self.resampler:
+                chunk = self.resampler.process(chunk)
+            samples = len(chunk)
+            count = self._reserve(samples)
+            self.data[self.length:self.length + count] = chunk[:count]
+        
+        if count < samples:
+            self.truncated = True
+        if count > 0:
+            if self.stored_channels > 1:
+                self._measure(self.data[self.length:self.length + count])
+            self.length += count
+        return not self.truncated
+    
+    def view(self):
+        """Return the captured mono samples without copying."""
+        # Read length before data: a concurrent grow copies everything up to
+        # the old length, so either array is valid for that many samples.
+        length = self.length
+        data = self.data[:length]
+        if self.stored_channels == 1:
+            return data
+        return data.reshape(-1, self.stored_channels)[:, self.best_channel()]
+    
+    def __len__(self):
+        return self.length
+
+def record_audio(source=None):
+    """Records audio while hotkey is held (or until a file/synthetic source runs out)."""
+    global recording, capture_buffer, audio_source, streamer
+    
+    # Wait until the previous recording has finished with the (possibly shared) stream
+    with capture_lock:
+        trace = current_trace or DictationTrace()
+        source = source or create_audio_source()
+        audio_source = source
+        
+        # Get audio settings from config
+        chunk = config["audio"]["chunk"]
+        channels = source.channels
+        
+        # Whatever rate the device runs at, the buffer holds 16 kHz audio for Whisper
+        capture_buffer = CaptureBuffer(source.rate, channels,
+                                       max_seconds=config["audio"].get("max_buffer_seconds", 600),
+                                       sample_format=source.sample_format, out_rate=WHISPER_RATE,
+                                       downmix=config["audio"]["downmix"],
+                                       speech_db=config["vad"]["threshold_db"])
+        rate = capture_buffer.rate
+        
+        # Decode rolling windows while the hotkey is still held
+        streamer = None
+        if config["streaming"]["enabled"]:
+            streamer = StreamingTranscriber(capture_buffer, rate)
+            streamer.start()
+        
+        try:
+            # Open audio stream (or resume a warm one)
+            source.open()
+            trace.mark("stream_open")
+            
+            # Record audio while the hotkey is pressed
+            while recording:
+                try:
+                    data = source.read(chunk)
+                    if not data:
+                        trace.mark("source_end")
+                        break
+                    if not capture_buffer.append(data):
+                        print("! Recording reached the buffer limit, stopping")
+                        break
+                except OSError as e:
+                    print(f"! Audio buffer overflow: {str(e)}")
+                    time.sleep(0.01)
+        
+        except Exception as e:
+            print(f"! Error during recording: {str(e)}")
+        finally:
             try:
-                stream.stop_stream()
-                stream.close()
+                source.close()
+                # Keep what the callback queued between the last read and the release
+                tail = source.drain()
+                if tail:
+                    capture_buffer.append(tail)
             except Exception as e:
                 print(f"! Error closing stream: {str(e)}")
-                
-        if frames:  # Only save and transcribe if we have recorded frames
-            assets_dir = ensure_directories()
-            audio_file = assets_dir / "dictation.wav"
+            audio_source = None
+            trace.mark("stream_closed")
             
-            try:
-                # Save audio file
-                with wave.open(str(audio_file), "wb") as wf:
-                    wf.setnchannels(channels)
-                    wf.setsampwidth(audio.get_sample_size(audio_format))
-                    wf.setframerate(rate)
-                    wf.writeframes(b''.join(frames))
+            if source.failed:
+                try:
+                    restart_audio()
+                except Exception as e:
+                    print(f"! Error re-initializing audio: {e}")
+            
+            capture_stats = source.stats()
+            if capture_stats:
+                trace.info["capture"] = capture_stats
+                lost = capture_stats["dropped_chunks"] + capture_stats["input_overflows"]
+                if lost:
+                    print(f"! Audio lost during recording: {capture_stats['dropped_chunks']} chunks dropped, "
+                          f"{capture_stats['input_overflows']} input overflows")
+            
+            if streamer:
+                streamer.stop()
+            
+            if len(capture_buffer):  # Only transcribe if we have recorded samples
+                # Hand the samples straight to the transcriber - no disk round-trip
+                audio_data = capture_buffer.view()
+                trace.mark("buffer_finalized")
+                trace.info["audio_seconds"] = round(len(audio_data) / rate, 2)
+                if capture_buffer.stored_channels > 1:
+                    trace.info["best_channel"] = capture_buffer.best_channel()
+                # Queue state on arrival; the wait itself is job_start - buffer_finalized
+                trace.info["queue"] = transcription_worker.stats()
+                if streamer:
+                    transcription_worker.submit(finish_streaming, streamer, trace,
+                                                discard=partial(abandon_streaming, streamer, trace))
+                else:
+                    transcription_worker.submit(transcribe_audio, audio_data, trace,
+                                                discard=partial(finish_trace, trace))
                 
-                # Start transcription in a separate thread
-                threading.Thread(target=transcribe_audio, args=(audio_file,), daemon=True).start()
-            except Exception as e:
-                print(f"! Error saving audio: {str(e)}")
+                # Optionally keep a copy on disk for debugging/archival
+                if config["audio"].get("save_wav", False):
+                    save_audio_file(audio_data, 1, rate)
+            else:
+                finish_trace(trace, "empty")
 
-def transcribe_audio(audio_file):
-    """Transcribes the recorded audio and outputs words."""
-    global model
+def save_audio_file(audio_data, channels, rate):
+    """Write captured audio to assets/dictation.wav as 16-bit PCM (debug/archival only)."""
+    try:
+        assets_dir = ensure_directories()
+        audio_file = assets_dir / "dictation.wav"
+        pcm = (np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16)
+        with wave.open(str(audio_file), "wb") as wf:
+            wf.setnchannels(channels)
+            wf.setsampwidth(2)
+            wf.setframerate(rate)
+            wf.writeframes(pcm.tobytes())
+    except Exception as e:
+        print(f"! Error saving audio: {str(e)}")
+
+def find_speech(audio_data, rate):
+    """Locate speech with a simple energy-based voice activity detector.
+    
+    Returns (start, end) sample indices covering the speech plus padding, or
+    None if the audio contains no speech at all.
+    """
+    vad_cfg = config["vad"]
+    frame = max(int(rate * 0.03), 1)  # 30 ms frames
+    count = len(audio_data) // frame
+    if count == 0:
+        return None
+    
+    # Per-frame energy in dBFS, without materialising a squared copy of the audio
+    frames = audio_data[:count * frame].reshape(count, frame)
+    energy = 10 * np.log10(np.einsum('ij,ij->i', frames, frames) / frame + 1e-10)
     
+    # Speech must clear the absolute threshold and stand out from the noise floor,
+    # but never require more than margin_db below the loudest frame
+    noise_floor = np.percentile(energy, 10)
+    threshold = max(vad_cfg["threshold_db"],
+                    min(noise_floor + vad_cfg["margin_db"], energy.max() - vad_cfg["margin_db"]))
+    speech = np.flatnonzero(energy > threshold)
+    
+    if len(speech) * frame * 1000 < vad_cfg["min_speech_ms"] * rate:
+        return None
+    
+    padding = int(vad_cfg["padding_ms"] * rate / 1000)
+    start = max(int(speech[0]) * frame - padding, 0)
+    end = min((int(speech[-1]) + 1) * frame + padding, len(audio_data))
+    return start, end
+
+def trim_silence(audio_data, rate):
+    """Trim leading/trailing silence. Returns a view of the speech, or None if there is none."""
+    if not config["vad"]["enabled"]:
+        return audio_data
+    
+    bounds = find_speech(audio_data, rate)
+    if bounds is None:
+        print(f"! No speech detected in {len(audio_data) / rate:.2f}s of audio, skipping model")
+        return None
+    
+    start, end = bounds
+    removed = len(audio_data) - (end - start)
+    if removed:
+        print(f"• VAD trimmed {removed / rate:.2f}s of silence "
+              f"({start / rate:.2f}s leading, {(len(audio_data) - end) / rate:.2f}s trailing)")
+    return audio_data[start:end]
+
+# ============= Transcription Functions =============
+
+def run_model(audio_data, prompt=None, backend=None):
+    """Run a transcription backend (the active model by default) over float32 samples."""
+    # A best-channel recording is a strided view; backends want contiguous samples
+    audio_data = np.ascontiguousarray(audio_data)
+    # Streaming passes and queued jobs share the CPU; never run models concurrently
+    with model_lock:
+        return (backend or model).transcribe(audio_data, language=config["language"], prompt=prompt)
+
+def injection_method(text):
+    """Resolve output.method to "type" or "paste" for this text ("auto" pastes long text)."""
+    output_cfg = config["output"]
+    if output_cfg["method"] == "auto":
+        return "paste" if len(text) >= output_cfg["paste_min_chars"] else "type"
+    return output_cfg["method"]
+
+def type_text(text, trace=None):
+    """Copy text to the clipboard and type it one synthetic key event per character."""
+    import keyboard
+    
+    trace = trace or DictationTrace()
+    trace.mark("clipboard_start")
+    pyperclip.copy(text)
+    trace.mark("clipboard_end")
+    
+    trace.mark("typing_start")
+    keyboard.write(text)
+    trace.mark("typing_end")
+
+def restore_clipboard(pasted_text, previous):
+    """Put the previous clipboard back, unless something new was copied since the paste."""
     try:
-        if not os.path.exists(audio_file):
-            print(f"! Audio file not found: {audio_file}")
+        if pyperclip.paste() == pasted_text:
+            pyperclip.copy(previous)
+    except pyperclip.PyperclipException as e:
+        print(f"! Could not restore clipboard: {e}")
+
+def paste_text(text, trace=None):
+    """Insert text in one step with Ctrl+V, then restore the clipboard the user had."""
+    import keyboard
+    
+    trace = trace or DictationTrace()
+    output_cfg = config["output"]
+    trace.mark("clipboard_start")
+    previous = None
+    if output_cfg["restore_clipboard"]:
+        try:
+            # pyperclip returns "" for an empty or non-text clipboard (image, files);
+            # restoring that would clear it, so only text is put back
+            previous = pyperclip.paste() or None
+        except pyperclip.PyperclipException:
+            previous = None  # Unreadable clipboard: leave ours in place
+    
+    pyperclip.copy(text)
+    trace.mark("clipboard_end")
+    
+    trace.mark("typing_start")
+    keyboard.send("ctrl+v")
+    trace.mark("typing_end")
+    
+    if previous is not None:
+        # The target app reads the clipboard asynchronously after Ctrl+V
+        restore = threading.Timer(output_cfg["restore_delay_ms"] / 1000,
+                                  restore_clipboard, args=(text, previous))
+        restore.daemon = True
+        restore.start()
+
+def output_text(transcribed_text, trace=None):
+    """Insert the transcription at the cursor by typing or pasting it."""
+    trace = trace or DictationTrace()
+    
+    if config["output"]["method"] == "none":
+        # Headless runs: report the text without touching the clipboard or keyboard
+        print(f"✓ Transcribed: \"{transcribed_text}\"")
+        return
+    
+    if transcribed_text:
+        print(f"✓ Transcribed: \"{transcribed_text}\"")
+        
+        method = injection_method(transcribed_text)
+        trace.info["output_method"] = method
+        if method == "paste":
+            paste_text(transcribed_text, trace)
+        else:
+            type_text(transcribed_text, trace)
+    else:
+        print("! No speech detected")
+
+def typing_edit(old_text, new_text):
+    """The smallest backspace+type edit turning old_text into new_text: (backspaces, text to type)."""
+    prefix = len(os.path.commonprefix([old_text, new_text]))
+    return len(old_text) - prefix, new_text[prefix:]
+
+def replace_typed_text(old_text, new_text):
+    """Turn already-typed old_text into new_text by backspacing and retyping the changed suffix."""
+    import keyboard
+    
+    backspaces, suffix = typing_edit(old_text, new_text)
+    for _ in range(backspaces):
+        keyboard.send("backspace")
+    if suffix:
+        keyboard.write(suffix)
+
+def live_output_mode():
+    """streaming.live_output, or "off" when the hotkey uses modifiers.
+    
+    Live text is typed while the hotkey is still held. With Ctrl or Shift down,
+    the injected keys would arrive as shortcuts (Ctrl+Shift+Backspace deletes
+    whole words), so live typing needs a modifier-free hotkey, ideally a named
+    key such as F13 so no letter is lost to it.
+    """
+    hotkey_cfg = config["hotkey"]
+    if hotkey_cfg["ctrl"] or hotkey_cfg["shift"]:
+        return "off"
+    return config["streaming"]["live_output"]
+
+class LiveTyper:
+    """Keeps the text typed at the cursor in step with a transcript that is still changing.
+    
+    Each update types only the difference from what is already on screen, so the
+    cost of an update follows the size of the change, not of the transcript.
+    """
+    def __init__(self):
+        self.typed = ""
+        self.lock = threading.Lock()
+        self.updates = 0
+        self.keystrokes = 0
+        self.retype_keystrokes = 0  # What erasing and retyping everything would have cost
+    
+    def update(self, text):
+        """Edit the typed text into text."""
+        with self.lock:
+            if text == self.typed:
+                return
+            backspaces, suffix = typing_edit(self.typed, text)
+            if config["output"]["method"] != "none":
+                replace_typed_text(self.typed, text)
+            self.updates += 1
+            self.keystrokes += backspaces + len(suffix)
+            self.retype_keystrokes += len(self.typed) + len(text)
+            self.typed = text
+    
+    def stats(self):
+        return {
+            "live_updates": self.updates,
+            "live_keystrokes": self.keystrokes,
+            "live_retype_keystrokes": self.retype_keystrokes,
+        }
+
+def two_pass_draft_model():
+    """The draft model for two-pass dictation, or None if two-pass is off or pointless."""
+    draft_name = config["two_pass"]["draft_model"]
+    if not config["two_pass"]["enabled"] or draft_name == model_name:
+        return None
+    return model_cache.get(draft_name)
+
+def transcribe_two_pass(audio_data, draft_backend, trace):
+    """Type a fast draft immediately, then correct it in place with the main model's result."""
+    print("→ Transcribing draft...")
+    trace.mark("inference_start")
+    draft_text = run_model(audio_data, backend=draft_backend)["text"].strip()
+    trace.mark("inference_end")
+    output_text(draft_text, trace)
+    
+    # Re-decode the same audio with the larger model; the job stays on the
+    # worker so the next dictation can't be typed in between
+    trace.mark("final_inference_start")
+    final_text = run_model(audio_data)["text"].strip()
+    trace.mark("final_inference_end")
+    if final_text != draft_text:
+        print(f"✓ Corrected: \"{final_text}\"")
+        if config["output"]["method"] != "none":
+            trace.mark("correction_start")
+            replace_typed_text(draft_text, final_text)
+            if injection_method(draft_text) == "type":
+                pyperclip.copy(final_text)  # Pasting restores the user's clipboard instead
+            trace.mark("correction_end")
+    return final_text
+
+def transcribe_audio(audio_data, trace=None):
+    """Transcribes recorded audio (float32 samples in [-1, 1]) and outputs words."""
+    trace = trace or DictationTrace()
+    trace.mark("job_start")
+    outcome = "error"
+    try:
+        audio_data = trim_silence(audio_data, WHISPER_RATE)
+        if audio_data is None:
+            outcome = "no_speech"
+            return
+        
+        draft_backend = two_pass_draft_model()
+        if draft_backend:
+            text = transcribe_two_pass(audio_data, draft_backend, trace)
+        else:
+            print("→ Transcribing audio...")
+            
+            # Transcribe using the audio data directly
+            trace.mark("inference_start")
+            result = run_model(audio_data)
+            trace.mark("inference_end")
+            
+            text = result["text"].strip()
+            output_text(text, trace)
+        outcome = "typed" if text else "no_speech"
+            
+    except Exception as e:
+        print(f"! Error during transcription: {e}")
+    finally:
+        finish_trace(trace, outcome)
+
+class StreamingTranscriber:
+    """Transcribes a recording in rolling windows while it is still being captured.
+    
+    Each pass decodes everything after the committed point. Segments that come
+    back unchanged in two consecutive passes (and are not the last, still-growing
+    segment) are committed, and the committed point moves to their end. After the
+    hotkey is released only the uncommitted tail has to be decoded.
+    """
+    def __init__(self, buffer, rate):
+        self.buffer = buffer
+        self.rate = rate
+        self.step = config["streaming"]["step_seconds"]
+        self.min_samples = int(config["streaming"]["min_seconds"] * rate)
+        self.max_window = int(config["streaming"]["max_window_seconds"] * rate)
+        self.committed_samples = 0
+        self.committed_text = []
+        self.previous = []
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.live_output = live_output_mode()
+        self.typer = LiveTyper() if self.live_output != "off" else None
+    
+    def start(self):
+        """Start decoding in the background."""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        while not self.stop_event.wait(self.step):
+            try:
+                self.decode_pass()
+            except Exception as e:
+                print(f"! Error during streaming transcription: {e}")
+    
+    def prompt(self):
+        """Committed text, fed back to the model as context for the next window."""
+        return " ".join(self.committed_text) or None
+    
+    def decode_pass(self):
+        """Decode the uncommitted audio and commit any segments that have settled."""
+        tail = self.buffer.view()[self.committed_samples:]
+        if len(tail) < self.min_samples or not model_ready.is_set():
             return
         
-        print("→ Transcribing audio...")
+        # Skip leading silence; segment times are relative to the trimmed start
+        start = 0
+        if config["vad"]["enabled"]:
+            bounds = find_speech(tail, self.rate)
+            if bounds is None:
+                return
+            start = bounds[0]
         
-        # Load the audio file as a numpy array
-        with wave.open(str(audio_file), 'rb') as wf:
-            audio_data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        segments = run_model(tail[start:], self.prompt())["segments"]
+        texts = [segment["text"].strip() for segment in segments]
         
-        # Convert to float32 and normalize
-        audio_data = audio_data.astype(np.float32) / 32768.0
+        # Commit segments that agree with the previous pass; once the window gets
+        # too long, commit everything but the last segment regardless
+        force = len(tail) >= self.max_window
+        count = 0
+        for i in range(len(segments) - 1):
+            if not force and (i >= len(self.previous) or self.previous[i] != texts[i]):
+                break
+            count = i + 1
         
-        # Transcribe using the audio data directly
-        result = model.transcribe(audio_data, language=config["language"])
+        if self.stop_event.is_set():
+            return  # Hotkey released mid-pass; finish() decodes the tail anyway
         
-        transcribed_text = result["text"].strip()
+        if count:
+            self.committed_text.extend(text for text in texts[:count] if text)
+            self.committed_samples += start + int(segments[count - 1]["end"] * self.rate)
+        self.previous = texts[count:]
         
-        # Copy to clipboard
-        pyperclip.copy(transcribed_text)
+        if self.typer and output_idle():
+            self.typer.update(self.live_text())
+    
+    def live_text(self):
+        """What should be on screen so far: the committed text, plus the latest guess if typing tentatively."""
+        texts = self.committed_text + (self.previous if self.live_output == "tentative" else [])
+        return " ".join(text for text in texts if text)
+    
+    def stop(self):
+        """Stop decoding passes (called as soon as the hotkey is released)."""
+        self.stop_event.set()
+    
+    def finish(self):
+        """Stop streaming, decode the remaining tail and return the full text."""
+        self.stop()
+        if self.thread:
+            self.thread.join()
         
-        if transcribed_text:
-            # Type the text immediately without word-by-word delay
-            print(f"✓ Transcribed: \"{transcribed_text}\"")
-            
-            # Type all at once - no delays
-            keyboard.write(transcribed_text)
+        tail = self.buffer.view()[self.committed_samples:]
+        texts = list(self.committed_text)
+        if len(tail) >= self.rate // 10:
+            tail = trim_silence(tail, self.rate)
+            if tail is not None:
+                texts.append(run_model(tail, self.prompt())["text"].strip())
+        return " ".join(text for text in texts if text)
+
+def finish_streaming(active_streamer, trace=None):
+    """Decode the tail of a streamed recording and output the full text."""
+    trace = trace or DictationTrace()
+    trace.mark("job_start")
+    outcome = "error"
+    try:
+        print("→ Transcribing final audio...")
+        trace.mark("inference_start")
+        text = active_streamer.finish()
+        trace.mark("inference_end")
+        typer = active_streamer.typer
+        if typer and typer.typed:
+            # Part of the text is already on screen; only fix up the rest
+            print(f"✓ Transcribed: \"{text}\"")
+            trace.info["output_method"] = "live"
+            trace.mark("typing_start")
+            typer.update(text)
+            trace.mark("typing_end")
+            trace.info.update(typer.stats())
         else:
-            print("! No speech detected")
-            
+            output_text(text, trace)
+        outcome = "typed" if text else "no_speech"
     except Exception as e:
         print(f"! Error during transcription: {e}")
     finally:
-        # Clean up the temporary audio file
-        try:
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
-        except Exception as e:
-            print(f"! Error removing temporary file: {e}")
+        finish_trace(trace, outcome)
+
+def abandon_streaming(active_streamer, trace, outcome):
+    """Close out a streamed recording whose final pass will never run.
+    
+    Text already typed live stays on screen as it is; the trace records how much.
+    """
+    active_streamer.stop()
+    if active_streamer.thread:
+        active_streamer.thread.join()
+    if active_streamer.typer and trace:
+        trace.info.update(active_streamer.typer.stats())
+    finish_trace(trace, outcome)
+
+# ============= Transcription Worker =============
+
+def output_idle():
+    """True when no earlier dictation is still waiting to be typed."""
+    worker = transcription_worker
+    return worker is None or (not worker.busy and worker.depth() == 0)
+
+class TranscriptionJob:
+    """A queued unit of transcription work.
+    
+    discard, if set, is called with an outcome ("dropped" or "stale") instead of
+    func when the job is thrown away, so the recording still gets its trace.
+    """
+    def __init__(self, func, args, discard=None):
+        self.func = func
+        self.args = args
+        self.discard = discard
+        self.submitted = time.time()
+
+class TranscriptionWorker:
+    """Single long-lived thread that runs transcription jobs in FIFO order.
+    
+    Running one job at a time keeps output in dictation order and stops
+    back-to-back recordings from competing for the same model and CPU cores.
+    When the queue is full, config["worker"]["when_full"] decides what happens:
+    "drop_oldest" cancels the oldest waiting job, "drop_newest" rejects the new
+    one, and "block" makes the submitter wait. Jobs that waited longer than
+    max_wait_seconds are discarded as stale instead of typing late text.
+    """
+    def __init__(self, max_queue=4, when_full="drop_oldest", max_wait=60):
+        self.max_queue = max(max_queue, 1)
+        self.when_full = when_full
+        self.max_wait = max_wait
+        self.jobs = deque()
+        self.cond = threading.Condition()
+        self.thread = None
+        self.processed = 0
+        self.dropped = 0
+        self.last_wait = 0.0
+        self.max_wait_seen = 0.0
+        self.busy = False
+    
+    def start(self):
+        """Start the worker thread."""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def submit(self, func, *args, discard=None):
+        """Queue func(*args). Returns the job, or None if it was rejected."""
+        job = TranscriptionJob(func, args, discard)
+        dropped = None
+        with self.cond:
+            if len(self.jobs) >= self.max_queue:
+                if self.when_full == "drop_newest":
+                    print("! Transcription queue full, dropping new recording")
+                    dropped, job = job, None
+                elif self.when_full == "block":
+                    while len(self.jobs) >= self.max_queue:
+                        self.cond.wait()
+                else:
+                    dropped = self.jobs.popleft()
+                    print("! Transcription queue full, dropping oldest recording")
+            if job:
+                self.jobs.append(job)
+                self.cond.notify_all()
+        # Outside the lock: discarding a streamed job joins its decode thread
+        if dropped:
+            self.discard(dropped, "dropped")
+        return job
+    
+    def cancel_pending(self):
+        """Cancel every job that has not started yet."""
+        with self.cond:
+            cancelled = list(self.jobs)
+            self.jobs.clear()
+            self.cond.notify_all()
+        for job in cancelled:
+            self.discard(job, "dropped")
+    
+    def discard(self, job, outcome):
+        """Count a job that will never run and let it record its outcome."""
+        self.dropped += 1
+        if job.discard:
+            try:
+                job.discard(outcome)
+            except Exception as e:
+                print(f"! Error discarding transcription job: {e}")
+    
+    def drain(self, timeout=None):
+        """Wait until every queued job has finished. Returns False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self.cond:
+            while self.jobs or self.busy:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+        return True
+    
+    def depth(self):
+        """Number of jobs waiting to run."""
+        with self.cond:
+            return len(self.jobs)
+    
+    def stats(self):
+        """Queue metrics for spotting contention."""
+        return {
+            "depth": self.depth(),
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "last_wait": self.last_wait,
+            "max_wait": self.max_wait_seen,
+        }
+    
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.jobs:
+                    self.cond.wait()
+                job = self.jobs.popleft()
+                pending = len(self.jobs)
+                self.busy = True
+                self.cond.notify_all()
+            
+            # Time spent waiting for the queue, not for the startup model load
+            wait = time.time() - job.submitted
+            if not model_ready.is_set():
+                print("→ Waiting for model to finish loading...")
+                while not model_ready.wait(0.5) and not model_failed.is_set():
+                    pass
+            self.last_wait = wait
+            self.max_wait_seen = max(self.max_wait_seen, wait)
+            if not model_ready.is_set():
+                print("! No model loaded, dropping recording")
+                self.discard(job, "no_model")
+            elif wait > self.max_wait:
+                print(f"! Discarding stale recording (queued {wait:.1f}s)")
+                self.discard(job, "stale")
+            else:
+                if pending or wait >= 0.1:
+                    print(f"• Queue: waited {wait:.2f}s, {pending} more pending")
+                try:
+                    job.func(*job.args)
+                except Exception as e:
+                    print(f"! Error in transcription worker: {e}")
+                self.processed += 1
+                mark_activity()
+            
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()
+
+def start_transcription_worker():
+    """Create and start the global transcription worker from config."""
+    global transcription_worker
+    
+    worker_cfg = config["worker"]
+    transcription_worker = TranscriptionWorker(
+        max_queue=worker_cfg["max_queue"],
+        when_full=worker_cfg["when_full"],
+        max_wait=worker_cfg["max_wait_seconds"]
+    )
+    transcription_worker.start()
+    return transcription_worker
+
+# ============= Latency Tracing =============
+
+class DictationTrace:
+    """Timestamps for one dictation, from hotkey down to the last character typed.
+    
+    Events are stored in milliseconds relative to the hotkey press (or to when
+    the trace was created if that time isn't known).
+    """
+    def __init__(self, origin=None):
+        self.started_at = time.time()
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.events = {"hotkey_down": 0.0} if origin is not None else {}
+        self.info = {}
+    
+    def mark(self, event, at=None):
+        """Record that event happened now (or at the given perf_counter time)."""
+        at = time.perf_counter() if at is None else at
+        self.events[event] = round((at - self.origin) * 1000, 2)
+    
+    def between(self, start_event, end_event):
+        """Milliseconds from start_event to end_event, or None if either is missing."""
+        if start_event in self.events and end_event in self.events:
+            return self.events[end_event] - self.events[start_event]
+        return None
+    
+    def to_dict(self):
+        return {"started_at": self.started_at, "model": model_name, **self.info, "events": self.events}
+
+def get_trace_logger():
+    """Logger writing one JSON trace per line to a size-rotated file."""
+    global trace_logger
+    
+    if trace_logger is None:
+        tracing_cfg = config["tracing"]
+        Path(tracing_cfg["file"]).parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            tracing_cfg["file"], maxBytes=tracing_cfg["max_bytes"],
+            backupCount=tracing_cfg["backups"], encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_logger = logging.getLogger("whisper_dictation.traces")
+        trace_logger.setLevel(logging.INFO)
+        trace_logger.propagate = False
+        trace_logger.addHandler(handler)
+    return trace_logger
+
+def finish_trace(trace, outcome):
+    """Write a completed trace and update the latency summary."""
+    if not trace or not config["tracing"]["enabled"]:
+        return
+    trace.info["outcome"] = outcome
+    
+    # Release-to-text: hotkey up until the last character is typed
+    latency = trace.between("hotkey_up", "typing_end")
+    if latency is not None:
+        recent_latencies.append(latency)
+        print(f"• Latency: {latency:.0f} ms from release to text "
+              f"(inference {trace.between('inference_start', 'inference_end') or 0:.0f} ms)")
+        if indicator:
+            indicator.set_latency_summary(latency_summary())
+    
+    try:
+        get_trace_logger().info(json.dumps(trace.to_dict()))
+    except Exception as e:
+        print(f"! Error writing trace: {e}")
+
+def latency_summary():
+    """p50/p95 release-to-text latency over recent dictations, for the UI."""
+    if not recent_latencies:
+        return ""
+    p50, p95 = np.percentile(list(recent_latencies), [50, 95])
+    return f"Latency p50 {p50 / 1000:.2f}s · p95 {p95 / 1000:.2f}s"
 
 # ============= Recording Control Functions =============
 
+def mark_activity():
+    """Note that dictation was used, postponing idle model unloading."""
+    global last_activity_time
+    last_activity_time = time.time()
+
 def start_recording():
     """Start the recording process."""
-    global recording, audio_thread, hotkey_pressed, last_keydown_time
+    global recording, audio_thread, hotkey_pressed, last_keydown_time, current_trace
     
     if not recording:
+        current_trace = DictationTrace(hotkey_down_at)
+        current_trace.mark("recording_start")
+        if hotkey_latency_ms is not None:
+            current_trace.info["hook_latency_ms"] = round(hotkey_latency_ms, 2)
         recording = True
         hotkey_pressed = True
         last_keydown_time = time.time()
+        mark_activity()
+        ensure_model_loaded()
         print("→ Recording... (Release hotkey to stop)")
-        indicator.show()
+        if indicator:
+            indicator.show()
         audio_thread = threading.Thread(target=record_audio, daemon=True)
         audio_thread.start()
 
@@ -335,75 +2082,155 @@ def stop_recording():
     if recording:
         recording = False
         hotkey_pressed = False
-        indicator.hide()
+        if current_trace:
+            # Use the hook's timestamp unless this stop wasn't a key release (e.g. timeout)
+            released = hotkey_up_at is not None and hotkey_up_at > current_trace.origin
+            current_trace.mark("hotkey_up", hotkey_up_at if released else None)
+        if indicator:
+            indicator.hide()
         print("✓ Recording stopped")
 
 # ============= Keyboard Hook Functions =============
 
-def keyboard_callback(nCode, wParam, lParam):
-    """Low-level keyboard hook callback function."""
-    global hotkey_active, recording, last_keydown_time
+def on_hotkey_down(latency_ms=None):
+    """Hotkey pressed: timestamp it and signal the dispatcher to start recording."""
+    global hotkey_down_at, hotkey_latency_ms, hotkey_wanted
+    hotkey_down_at = time.perf_counter()
+    hotkey_latency_ms = latency_ms
+    hotkey_wanted = True
+    hotkey_signal.set()
+
+def on_hotkey_up():
+    """Hotkey released: timestamp it and signal the dispatcher to stop recording."""
+    global hotkey_up_at, hotkey_wanted
+    hotkey_up_at = time.perf_counter()
+    hotkey_wanted = False
+    hotkey_signal.set()
+
+def hotkey_dispatcher():
+    """Standing thread that starts/stops recording when the hook signals a change."""
+    while True:
+        hotkey_signal.wait()
+        hotkey_signal.clear()
+        if hotkey_wanted:
+            start_recording()
+        else:
+            stop_recording()
+
+def start_hotkey_dispatcher():
+    """Start the thread that turns hotkey signals into start/stop calls."""
+    threading.Thread(target=hotkey_dispatcher, daemon=True).start()
+
+def hotkey_vk(key):
+    """Virtual key code for a hotkey key: a letter, a digit or a HOTKEY_NAMED_KEYS name."""
+    named = HOTKEY_NAMED_KEYS.get(key.lower())
+    if named:
+        return named[0]
+    if len(key) == 1 and key.isascii() and key.isalnum():
+        return ord(key.upper())
+    raise ValueError(f"Unsupported hotkey key: {key}")
+
+def hotkey_evdev_name(key):
+    """evdev key name (KEY_*) for a hotkey key."""
+    named = HOTKEY_NAMED_KEYS.get(key.lower())
+    return named[1] if named else "KEY_" + key.upper()
+
+class HotkeyMatcher:
+    """The configured hotkey, precomputed so the hook callback does no lookups or parsing."""
+    __slots__ = ("key_vk", "required_mask")
     
-    if nCode >= 0:
-        kb = ctypes.cast(lParam, ctypes.POINTER(KBDLLHOOKSTRUCT)).contents
-        
-        # Get our key configuration
-        hotkey_cfg = config["hotkey"]
+    def __init__(self, hotkey_cfg):
+        self.key_vk = hotkey_vk(hotkey_cfg["key"])
         
-        # Get the current state of CTRL and SHIFT
-        ctrl_pressed = user32.GetAsyncKeyState(VK_CONTROL) & 0x8000 != 0
-        shift_pressed = user32.GetAsyncKeyState(VK_SHIFT) & 0x8000 != 0
-        
-        # Convert the configured key to a virtual key code
-        target_key_code = ord(hotkey_cfg["key"].upper())
-        
-        # Detect if this is our hotkey combination
-        is_our_hotkey = (
-            ((not hotkey_cfg["ctrl"]) or ctrl_pressed) and
-            ((not hotkey_cfg["shift"]) or shift_pressed) and
-            kb.vkCode == target_key_code
-        )
-        
-        # For key up events, we should check if any of the required keys are released
-        is_key_released = (
-            (hotkey_cfg["ctrl"] and kb.vkCode == VK_CONTROL and wParam == WM_KEYUP) or
-            (hotkey_cfg["shift"] and kb.vkCode == VK_SHIFT and wParam == WM_KEYUP) or
-            (kb.vkCode == target_key_code and wParam == WM_KEYUP)
-        )
-        
-        # Handle the key events
-        if is_our_hotkey:
-            if wParam == WM_KEYDOWN and not hotkey_active:
-                # Key down - start recording
-                hotkey_active = True
-                threading.Thread(target=start_recording, daemon=True).start()
-                return -1  # Prevent the key from being processed further
-                
-            elif wParam == WM_KEYUP and hotkey_active:
-                # Key up - stop recording
+        # required_mask holds one group bit per required modifier; a group is
+        # satisfied if any of its keys (left, right or generic) is held
+        self.required_mask = (CTRL_MASK if hotkey_cfg["ctrl"] else 0) | (SHIFT_MASK if hotkey_cfg["shift"] else 0)
+
+def compile_hotkey():
+    """Build the hotkey matcher from config; call whenever the hotkey config changes."""
+    global hotkey_matcher
+    hotkey_matcher = HotkeyMatcher(config["hotkey"])
+
+def modifiers_satisfied(required, held):
+    """True if every modifier group in required has at least one key in held."""
+    return ((not required & CTRL_MASK or held & CTRL_MASK) and
+            (not required & SHIFT_MASK or held & SHIFT_MASK))
+
+def process_key_event(vk, wParam):
+    """Update modifier state and hotkey status for one key event.
+    
+    Runs for every keystroke system-wide, so it only does integer operations on
+    precomputed values; starting/stopping is handed to the hotkey dispatcher.
+    Returns True if the event should be swallowed.
+    """
+    global hotkey_active, held_modifiers
+    
+    is_down = wParam == WM_KEYDOWN or wParam == WM_SYSKEYDOWN
+    matcher = hotkey_matcher
+    
+    bit = MODIFIER_BITS.get(vk, 0)
+    if bit:
+        if is_down:
+            held_modifiers |= bit
+        else:
+            held_modifiers &= ~bit
+            # Releasing any required modifier ends the recording; let the event through
+            if hotkey_active and bit & matcher.required_mask:
                 hotkey_active = False
-                threading.Thread(target=stop_recording, daemon=True).start()
-                return -1  # Prevent the key from being processed further
-            
-            # Block the key if our hotkey is active
-            if hotkey_active:
-                return -1
-        
-        # If any part of the hotkey combination is released while recording, stop recording
-        elif is_key_released and recording and hotkey_active:
-            hotkey_active = False
-            threading.Thread(target=stop_recording, daemon=True).start()
-            # Let the key event pass through
+                on_hotkey_up()
+        return False
+    
+    if vk != matcher.key_vk:
+        return False
+    
+    if is_down:
+        if hotkey_active:
+            return True  # Autorepeat while held
+        required = matcher.required_mask
+        if modifiers_satisfied(required, held_modifiers):
+            if required and user32:
+                # A missed key-up (Win+L, secure desktop, a timed-out hook) can
+                # leave a modifier stuck; confirm before swallowing the key
+                seed_modifier_state()
+                if not modifiers_satisfied(required, held_modifiers):
+                    return False
+            # Key down - start recording
+            hotkey_active = True
+            on_hotkey_down()
+            return True
+    elif hotkey_active:
+        # Key up - stop recording
+        hotkey_active = False
+        on_hotkey_up()
+        return True
+    return False
+
+def keyboard_callback(nCode, wParam, lParam):
+    """Low-level keyboard hook callback function."""
+    # vkCode is the first DWORD of KBDLLHOOKSTRUCT. Injected events (our own
+    # typing and Ctrl+V) must not change hotkey or modifier state.
+    if (nCode >= 0 and not ctypes.c_uint32.from_address(lParam + FLAGS_OFFSET).value & LLKHF_INJECTED
+            and process_key_event(ctypes.c_uint32.from_address(lParam).value, wParam)):
+        return -1  # Prevent the key from being processed further
     
     # Pass the key event to the next hook
     return user32.CallNextHookEx(keyboard_hook, nCode, wParam, lParam)
 
+def seed_modifier_state():
+    """Read modifier state from the OS: once at install, and to confirm a hotkey press."""
+    global held_modifiers
+    held_modifiers = 0
+    for vk, bit in MODIFIER_BITS.items():
+        if user32.GetAsyncKeyState(vk) & 0x8000:
+            held_modifiers |= bit
+
 def setup_keyboard_hook():
     """Set up the low-level keyboard hook."""
     global keyboard_hook, keyboard_hook_func
     
     # Create the hook function
     keyboard_hook_func = LowLevelKeyboardProc(keyboard_callback)
+    seed_modifier_state()
     
     # Register the hook
     keyboard_hook = user32.SetWindowsHookExW(
@@ -437,11 +2264,176 @@ def message_loop():
         user32.TranslateMessage(ctypes.byref(msg))
         user32.DispatchMessageW(ctypes.byref(msg))
 
+# ============= Hotkey Backends =============
+
+class HotkeyBackend:
+    """Delivers hotkey press/release to on_hotkey_down/on_hotkey_up.
+    
+    install() returns True on success, run() blocks processing events (it is
+    started on a daemon thread) and remove() undoes install().
+    """
+    name = "none"
+    
+    def install(self):
+        return False
+    
+    def run(self):
+        pass
+    
+    def remove(self):
+        pass
+
+class Win32HotkeyBackend(HotkeyBackend):
+    """Windows low-level keyboard hook (SetWindowsHookExW); swallows the hotkey."""
+    name = "win32"
+    
+    def install(self):
+        return setup_keyboard_hook()
+    
+    def run(self):
+        message_loop()
+    
+    def remove(self):
+        remove_keyboard_hook()
+
+class EvdevHotkeyBackend(HotkeyBackend):
+    """Linux hotkey reading keyboards through evdev (/dev/input, needs the input group).
+    
+    Events are observed, not grabbed, so the key also reaches the focused app.
+    Kernel event timestamps give the delivery latency of each press.
+    """
+    name = "evdev"
+    
+    def __init__(self):
+        self.devices = []
+        self.pressed = set()
+        self.active = False
+    
+    def install(self):
+        try:
+            import evdev
+        except ImportError:
+            print("! evdev is not installed (pip install evdev)")
+            return False
+        
+        ecodes = evdev.ecodes
+        hotkey_cfg = config["hotkey"]
+        self.key_code = ecodes.ecodes.get(hotkey_evdev_name(hotkey_cfg["key"]))
+        if self.key_code is None:
+            print(f"! Unsupported hotkey key: {hotkey_cfg['key']}")
+            return False
+        self.ctrl_codes = {ecodes.KEY_LEFTCTRL, ecodes.KEY_RIGHTCTRL}
+        self.shift_codes = {ecodes.KEY_LEFTSHIFT, ecodes.KEY_RIGHTSHIFT}
+        self.need_ctrl = hotkey_cfg["ctrl"]
+        self.need_shift = hotkey_cfg["shift"]
+        
+        # Every device that can produce the hotkey's main key
+        for path in evdev.list_devices():
+            try:
+                device = evdev.InputDevice(path)
+            except OSError:
+                continue
+            if self.key_code in device.capabilities().get(ecodes.EV_KEY, []):
+                self.devices.append(device)
+            else:
+                device.close()
+        
+        if not self.devices:
+            print("! No readable keyboard found in /dev/input (is the user in the 'input' group?)")
+            return False
+        print(f"✓ Keyboard hook installed (evdev, {len(self.devices)} device(s))")
+        return True
+    
+    def modifiers_held(self):
+        return ((not self.need_ctrl or self.pressed & self.ctrl_codes) and
+                (not self.need_shift or self.pressed & self.shift_codes))
+    
+    def handle(self, code, value, timestamp):
+        """Process one key event (value 1 = down, 0 = up, 2 = autorepeat)."""
+        if value == 1:
+            self.pressed.add(code)
+            if code == self.key_code and not self.active and self.modifiers_held():
+                self.active = True
+                on_hotkey_down((time.time() - timestamp) * 1000)
+        elif value == 0:
+            self.pressed.discard(code)
+            releases_hotkey = (code == self.key_code or
+                               (self.need_ctrl and code in self.ctrl_codes) or
+                               (self.need_shift and code in self.shift_codes))
+            if self.active and releases_hotkey:
+                self.active = False
+                on_hotkey_up()
+    
+    def run(self):
+        import select
+        from evdev import ecodes
+        
+        fds = {device.fd: device for device in self.devices}
+        while fds:
+            readable, _, _ = select.select(fds, [], [])
+            for fd in readable:
+                try:
+                    for event in fds[fd].read():
+                        if event.type == ecodes.EV_KEY:
+                            self.handle(event.code, event.value, event.timestamp())
+                except OSError:
+                    # Device unplugged
+                    fds.pop(fd).close()
+    
+    def remove(self):
+        for device in self.devices:
+            try:
+                device.close()
+            except OSError:
+                pass
+        self.devices = []
+
+class ScriptedHotkeyBackend(HotkeyBackend):
+    """Plays back a fixed script of presses and releases, for tests and benchmarks.
+    
+    script is a list of (delay_seconds, "down" | "up") steps.
+    """
+    name = "scripted"
+    
+    def __init__(self, script):
+        self.script = list(script)
+        self.stopped = threading.Event()
+    
+    def install(self):
+        return True
+    
+    def run(self):
+        for delay, action in self.script:
+            if self.stopped.wait(delay):
+                return
+            if action == "down":
+                on_hotkey_down(0.0)
+            else:
+                on_hotkey_up()
+    
+    def remove(self):
+        self.stopped.set()
+
+def create_hotkey_backend():
+    """Build the hotkey backend selected by config["hotkey"]["backend"] ("auto" picks per OS)."""
+    name = config["hotkey"].get("backend", "auto")
+    if name == "auto":
+        name = "win32" if sys.platform == "win32" else "evdev"
+    if name == "win32":
+        return Win32HotkeyBackend()
+    if name == "evdev":
+        return EvdevHotkeyBackend()
+    print(f"! Unknown hotkey backend '{name}'")
+    return HotkeyBackend()
+
 # ============= UI Components =============
 
 class RecordingIndicator:
     """Visual indicator for recording status."""
     def __init__(self):
+        import tkinter as tk
+        from tkinter import ttk
+        
         self.root = tk.Tk()
         self.root.title("Whisper Dictation")
         self.root.overrideredirect(False)  # Show window frame
@@ -466,10 +2458,13 @@ class RecordingIndicator:
         self.model_dropdown = ttk.Combobox(model_frame, textvariable=self.model_var, 
                                           values=AVAILABLE_MODELS, state="readonly", width=10)
         self.model_dropdown.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        if not model_ready.is_set():
+            self.model_dropdown.config(state="disabled")
         self.model_dropdown.bind("<<ComboboxSelected>>", self.on_model_change)
         
         # Add status label
-        self.status_label = tk.Label(self.main_frame, text="Ready")
+        self.idle_status = "Ready"
+        self.status_label = tk.Label(self.main_frame, text=self.idle_status)
         self.status_label.pack(pady=5)
         
         # Get indicator settings
@@ -502,6 +2497,10 @@ class RecordingIndicator:
         self.hotkey_label = tk.Label(self.main_frame, text=f"Hotkey: {hotkey_str}")
         self.hotkey_label.pack(pady=5)
         
+        # Add latency summary label (filled in after the first dictation)
+        self.latency_label = tk.Label(self.main_frame, text="", font=("TkDefaultFont", 8))
+        self.latency_label.pack()
+        
         # Add minimize to tray button
         self.minimize_button = tk.Button(self.main_frame, text="Minimize to Tray", command=self.minimize_to_tray)
         self.minimize_button.pack(pady=5)
@@ -510,7 +2509,7 @@ class RecordingIndicator:
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
         window_width = 200
-        window_height = 200
+        window_height = 220
         self.root.geometry(f'{window_width}x{window_height}+{screen_width - window_width - 20}+{screen_height - window_height - 40}')
         
         # Create system tray icon
@@ -526,7 +2525,15 @@ class RecordingIndicator:
         self.root.withdraw()
     
     def create_tray_icon(self):
-        """Create a system tray icon."""
+        """Create a system tray icon on a background thread."""
+        # pystray and PIL are only needed by the tray, so import them off the UI thread
+        threading.Thread(target=self.run_tray_icon, daemon=True).start()
+    
+    def run_tray_icon(self):
+        """Build the tray icon and run its event loop (blocks)."""
+        import pystray
+        from PIL import Image, ImageDraw
+        
         # Create an icon image
         icon_size = 64
         image = Image.new('RGBA', (icon_size, icon_size), color=(0, 0, 0, 0))
@@ -549,11 +2556,9 @@ class RecordingIndicator:
             pystray.MenuItem('Exit', self.exit_app)
         )
         
-        # Create the tray icon
+        # Create the tray icon and run it on this thread
         self.tray_icon = pystray.Icon("whisper_dictation", image, "Whisper Dictation", menu)
-        
-        # Start the icon in a separate thread
-        threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        self.tray_icon.run()
     
     def show_window(self, icon=None, item=None):
         """Show the main window from tray."""
@@ -585,7 +2590,7 @@ class RecordingIndicator:
         if new_model != config["model"]:
             # Show loading indicator
             self.status_label.config(text=f"Loading {new_model} model...")
-            self.model_dropdown.config(state=tk.DISABLED)
+            self.model_dropdown.config(state="disabled")
             self.root.update()
             
             # Update config
@@ -597,21 +2602,24 @@ class RecordingIndicator:
     
     def reload_model(self):
         """Reload the Whisper model with the new selection."""
-        global model
         try:
-            # Load the new model
-            model = load_whisper_model()
+            # Switch to the new model (instant if it is still cached)
+            activate_model(on_status=self.set_idle_status)
             
             # Update UI
-            self.root.after(0, lambda: self.status_label.config(text="Ready"))
+            self.set_idle_status("Ready")
             self.root.after(0, lambda: self.model_dropdown.config(state="readonly"))
         except Exception as e:
             print(f"! Error loading new model: {e}")
+            if not model_ready.is_set():
+                # No previous model to go back to; keep the choice so it can be retried
+                model_load_failed()
+                return
             # Revert to previous model
             config["model"] = model_name
             save_config()
             self.root.after(0, lambda: self.model_var.set(model_name))
-            self.root.after(0, lambda: self.status_label.config(text="Ready"))
+            self.set_idle_status("Ready")
             self.root.after(0, lambda: self.model_dropdown.config(state="readonly"))
     
     def open_settings(self, icon=None, item=None):
@@ -626,7 +2634,17 @@ class RecordingIndicator:
     def hide(self):
         """Hide the recording indicator."""
         self.canvas.itemconfig(self.indicator, fill=config["ui"]["indicator_color"])
-        self.status_label.config(text="Ready")
+        self.status_label.config(text=self.idle_status)
+    
+    def set_latency_summary(self, text):
+        """Show the latency summary (safe to call from any thread)."""
+        self.root.after(0, lambda: self.latency_label.config(text=text))
+    
+    def set_idle_status(self, text):
+        """Set the status shown when not recording (safe to call from any thread)."""
+        self.idle_status = text
+        if not recording:
+            self.root.after(0, lambda: self.status_label.config(text=text))
     
     def update_model_info(self):
         """Update the model info label."""
@@ -638,21 +2656,40 @@ class RecordingIndicator:
     
     def unhook_keyboard(self):
         """Remove the keyboard hook when exiting."""
-        remove_keyboard_hook()
+        if hotkey_backend:
+            hotkey_backend.remove()
         
     def stop_recording(self):
         """Stop the recording process by calling the global stop_recording function."""
         stop_recording()
 
+# ============= Startup Timing =============
+
+@contextmanager
+def timed(phase):
+    """Record how long a startup phase takes in startup_times."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_times[phase] = time.perf_counter() - start
+
+def format_startup_times():
+    """One-line breakdown of startup phases."""
+    return ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in startup_times.items())
+
 # ============= Main Function =============
 
 def main():
     """Main application entry point."""
-    global config, indicator, model, audio, stream, model_name
+    global indicator, audio, hotkey_backend
+    
+    startup_times["imports"] = IMPORT_END - IMPORT_START
     
     # Initialize the configuration
     try:
-        load_config()
+        with timed("config"):
+            load_config()
     except Exception as e:
         print(f"! Error loading configuration: {e}")
         return
@@ -666,22 +2703,24 @@ def main():
     
     # Initialize audio
     try:
-        audio = pyaudio.PyAudio()
+        with timed("audio"):
+            import pyaudio
+            audio = pyaudio.PyAudio()
     except Exception as e:
         print(f"! Error initializing audio: {e}")
         return
     
-    # Load whisper model
-    try:
-        model_name = config.get("model", "tiny")
-        model = load_whisper_model()
-    except Exception as e:
-        print(f"! Error loading model: {e}")
-        return
+    # Keep the microphone open for pre-roll, so stream open isn't on the hotkey path
+    with timed("preroll"):
+        start_preroll()
+    
+    # Start the transcription worker; jobs wait until the model is ready
+    start_transcription_worker()
     
     # Initialize UI
     try:
-        indicator = RecordingIndicator()
+        with timed("ui"):
+            indicator = RecordingIndicator()
     except Exception as e:
         print(f"! Error creating UI: {e}")
         return
@@ -689,19 +2728,26 @@ def main():
     # Print app info
     print("\n🎙️  Whisper Dictation")
     print("====================")
-    print(f"• Model: {model_name}")
+    print(f"• Model: {config['model']} ({config['backend']['engine']})")
     
     # Set up keyboard hooks
-    hook_successful = setup_keyboard_hook()
+    start_hotkey_dispatcher()
+    with timed("hook"):
+        hotkey_backend = create_hotkey_backend()
+        hook_successful = hotkey_backend.install()
     
     if hook_successful:
-        # Start the message loop to keep the hook active
-        message_thread = threading.Thread(target=message_loop, daemon=True)
+        # Start the backend's event loop to keep the hook active
+        message_thread = threading.Thread(target=hotkey_backend.run, daemon=True)
         message_thread.start()
     else:
         print("! Falling back to keyboard module")
         return
     
+    # Load whisper model without blocking the UI or the hotkey
+    print(f"✓ Interactive after {time.perf_counter() - IMPORT_START:.2f}s ({format_startup_times()})")
+    threading.Thread(target=load_initial_model, daemon=True).start()
+    
     # Show usage instructions
     hotkey_str = f"{config['hotkey']['ctrl'] and 'Ctrl+' or ''}{config['hotkey']['shift'] and 'Shift+' or ''}{config['hotkey']['key']}"
     print(f"• Hotkey: {hotkey_str}")
@@ -715,6 +2761,12 @@ def main():
             if recording and time.time() - last_keydown_time > max_hotkey_duration:
                 print(f"! Recording timed out after {max_hotkey_duration}s")
                 stop_recording()
+            
+            # Release the model after a long stretch without dictation
+            idle_minutes = config["model_cache"]["idle_unload_minutes"]
+            if (idle_minutes and model_ready.is_set() and not recording
+                    and time.time() - last_activity_time > idle_minutes * 60):
+                threading.Thread(target=unload_idle_model, daemon=True).start()
             indicator.root.after(1000, check_timeout)
         
         # Start the timeout checker
@@ -727,13 +2779,25 @@ def main():
     except Exception as e:
         print(f"! Error in main loop: {e}")
     finally:
-        # Clean up resources
-        remove_keyboard_hook()
+        # Clean up resources; recordings still queued must not type after exit
+        transcription_worker.cancel_pending()
+        hotkey_backend.remove()
+        
+        if audio_source:
+            try:
+                audio_source.close()
+            except:
+                pass
+        
+        if standing_source:
+            try:
+                standing_source.shutdown()
+            except:
+                pass
         
-        if stream:
+        if stream_pool:
             try:
-                stream.stop_stream()
-                stream.close()
+                stream_pool.close()
             except:
                 pass
             